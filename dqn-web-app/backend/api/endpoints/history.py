@@ -0,0 +1,67 @@
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+
+from main import run_history
+from core.run_history import HISTORY_SERIES
+
+router = APIRouter()
+
+@router.get("/history/runs")
+async def list_history_runs(limit: Optional[int] = Query(None, ge=1), offset: int = Query(0, ge=0),
+                            status: Optional[str] = None):
+    """List recorded training runs, newest first"""
+    return await run_in_threadpool(run_history.list_runs, limit, offset, status)
+
+@router.get("/history/runs/{run_id}")
+async def get_history_run(run_id: str):
+    """Get a recorded run's config and summary"""
+    run = await run_in_threadpool(run_history.get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+@router.get("/history/runs/{run_id}/series/{name}")
+async def get_history_series(run_id: str, name: str, start: Optional[int] = Query(None, ge=1),
+                             end: Optional[int] = Query(None, ge=1),
+                             points: int = Query(500, ge=2, le=5000)):
+    """Read episodes start..end of one series of a run, downsampled to at most points points"""
+    if name not in HISTORY_SERIES:
+        raise HTTPException(status_code=404, detail=f"Unknown series: {name}")
+    try:
+        return await run_in_threadpool(run_history.read_series, run_id, name, start, end, points)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/history/compare")
+async def compare_history_runs(run_ids: List[str] = Query(..., max_length=50),
+                               series: str = "episode_rewards",
+                               start: Optional[int] = Query(None, ge=1),
+                               end: Optional[int] = Query(None, ge=1),
+                               points: int = Query(200, ge=2, le=2000)):
+    """The same series of several runs, each read and downsampled in turn"""
+    if series not in HISTORY_SERIES:
+        raise HTTPException(status_code=404, detail=f"Unknown series: {series}")
+
+    def read_all():
+        results = {}
+        for run_id in run_ids:
+            try:
+                results[run_id] = run_history.read_series(run_id, series, start, end, points)
+            except FileNotFoundError:
+                results[run_id] = None
+        return results
+
+    return {"series": series, "runs": await run_in_threadpool(read_all)}
+
+@router.delete("/history/runs/{run_id}")
+async def delete_history_run(run_id: str):
+    """Delete a recorded run and its series files"""
+    try:
+        deleted = await run_in_threadpool(run_history.delete_run, run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {"message": f"Run {run_id} deleted"}
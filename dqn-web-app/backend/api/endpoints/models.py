@@ -1,48 +1,72 @@
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
 from fastapi.responses import FileResponse
-from typing import List, Dict
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Optional
 import os
 import json
 from datetime import datetime
-from main import training_manager
+from main import training_manager, model_registry, policy_cache
 
 router = APIRouter()
 
 @router.get("/models")
-async def list_models():
-    """List all saved models"""
-    models_dir = "models/saved"
-    if not os.path.exists(models_dir):
-        return {"models": []}
-
-    models = []
-    for filename in os.listdir(models_dir):
-        if filename.endswith('.pth'):
-            filepath = os.path.join(models_dir, filename)
-            stat = os.stat(filepath)
-            models.append({
-                "name": filename[:-4],  # Remove .pth extension
-                "filename": filename,
-                "size": stat.st_size,
-                "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-            })
-
-    return {"models": models}
+async def list_models(
+    sort: str = Query("modified", description="name, size, created, modified, episode or eval_score"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    search: Optional[str] = None,
+    min_episode: Optional[int] = None,
+    min_score: Optional[float] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+):
+    """List saved models from the registry index"""
+    try:
+        # Runs off the event loop: the query may refresh and hash checkpoint files
+        return await run_in_threadpool(
+            model_registry.query,
+            sort=sort, descending=order == "desc", search=search,
+            min_episode=min_episode, min_score=min_score, limit=limit, offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/models/cache/stats")
+async def get_policy_cache_stats():
+    """Hit/miss/eviction counters of the loaded-policy cache"""
+    return policy_cache.get_stats()
+
+@router.get("/models/{filename}/info")
+async def get_model_info(filename: str):
+    """Registry metadata of one saved model"""
+    model = await run_in_threadpool(model_registry.get, filename)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return model
 
 @router.post("/models/save")
-async def save_model(name: str):
-    """Save current trained model"""
+async def save_model(name: str, eval_episodes: int = Query(0, ge=0)):
+    """Save current trained model, optionally scoring it with a greedy evaluation"""
     if not training_manager.agent:
         raise HTTPException(status_code=400, detail="No trained model available")
 
     try:
         filepath = training_manager.save_model(name)
+        eval_score = None
+        if eval_episodes:
+            results = await run_in_threadpool(training_manager.evaluate_agent, eval_episodes)
+            eval_score = results["mean"]
+        model = model_registry.register(
+            filepath,
+            episode=training_manager.training_stats["episode"],
+            config=training_manager.config,
+            eval_score=eval_score
+        )
         return {
             "message": "Model saved successfully",
             "name": name,
-            "filepath": filepath
+            "filepath": filepath,
+            "model": model
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,6 +116,8 @@ async def delete_model(filename: str):
 
     try:
         os.remove(filepath)
+        model_registry.remove(filename)
+        policy_cache.invalidate(filepath)
         return {"message": "Model deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
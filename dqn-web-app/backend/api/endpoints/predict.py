@@ -0,0 +1,34 @@
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Union
+
+from main import inference_batcher
+
+router = APIRouter()
+
+class PredictRequest(BaseModel):
+    model: str
+    # A single state vector or a list of them
+    states: Union[List[float], List[List[float]]]
+
+@router.post("/predict")
+async def predict(request: PredictRequest):
+    """Q-values and greedy actions of a saved model, micro-batched with concurrent requests"""
+    try:
+        q_values, actions = await inference_batcher.predict(request.model, request.states)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "model": request.model,
+        "q_values": q_values.tolist(),
+        "actions": actions.tolist()
+    }
+
+@router.get("/predict/stats")
+async def get_predict_stats():
+    """Request/batch counters and latency percentiles of the inference batcher"""
+    return inference_batcher.get_stats()
@@ -0,0 +1,51 @@
+
+from fastapi import APIRouter, HTTPException
+
+from main import session_scheduler
+from api.endpoints.training import TrainingConfig
+
+router = APIRouter()
+
+@router.post("/sessions")
+async def create_session(config: TrainingConfig):
+    """Queue a training job in its own worker process"""
+    # Session workers are daemonic processes, which cannot start child
+    # processes such as distributed actors or async vector env workers
+    if config.distributed:
+        raise HTTPException(status_code=400, detail="Sessions do not support distributed training")
+    if config.num_envs > 1 and config.vector_mode == "async":
+        raise HTTPException(status_code=400,
+                            detail="Sessions do not support async vector environments; use vector_mode 'sync'")
+    session = session_scheduler.submit(config.dict())
+    return {
+        "message": "Training session queued",
+        "session_id": session.session_id,
+        "status": session.status,
+        "websocket": f"/ws/sessions/{session.session_id}"
+    }
+
+@router.get("/sessions")
+async def list_sessions():
+    """List all training sessions"""
+    return {
+        "sessions": session_scheduler.list_sessions(),
+        "running": session_scheduler.running_count,
+        "max_concurrent": session_scheduler.max_concurrent
+    }
+
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """Get status and statistics of a training session"""
+    session = session_scheduler.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session.to_dict()
+
+@router.post("/sessions/{session_id}/stop")
+async def stop_session(session_id: str):
+    """Cancel a queued session or stop a running one"""
+    if session_scheduler.get(session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if not session_scheduler.stop(session_id):
+        raise HTTPException(status_code=400, detail="Session is not queued or running")
+    return {"message": "Session stop requested", "session_id": session_id}
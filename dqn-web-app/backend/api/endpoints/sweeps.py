@@ -0,0 +1,69 @@
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Dict, Any, Optional
+
+from main import sweep_runner
+from api.endpoints.training import TrainingConfig
+from core.sweep import grid_configs, random_configs
+
+router = APIRouter()
+
+class SweepRequest(BaseModel):
+    base_config: TrainingConfig = TrainingConfig()
+    search: str = "grid"  # "grid" or "random"
+    # grid: field -> list of values
+    # random: field -> list of choices or {"low": x, "high": y, "log": bool}
+    parameters: Dict[str, Any] = {}
+    n_trials: int = 10
+    seed: Optional[int] = None
+    solve_score: float = 475.0
+
+@router.post("/sweeps")
+async def start_sweep(request: SweepRequest):
+    """Start a grid or random hyperparameter sweep over TrainingConfig fields"""
+    unknown = set(request.parameters) - set(TrainingConfig.__fields__)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown config fields: {sorted(unknown)}")
+    if not request.parameters:
+        raise HTTPException(status_code=400, detail="No sweep parameters given")
+
+    base = request.base_config.dict()
+    try:
+        if request.search == "grid":
+            configs = grid_configs(base, request.parameters)
+        elif request.search == "random":
+            configs = random_configs(base, request.parameters, request.n_trials, request.seed)
+        else:
+            raise HTTPException(status_code=400, detail="search must be 'grid' or 'random'")
+        # Validate and normalise so equal configs hash equally
+        configs = [TrainingConfig(**config).dict() for config in configs]
+    except (TypeError, KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sweep parameters: {e}")
+
+    sweep = sweep_runner.submit(configs, request.search, sorted(request.parameters),
+                                request.solve_score)
+    return {
+        "message": "Sweep started",
+        "sweep_id": sweep.sweep_id,
+        "trials": len(sweep.trials),
+        "cached": sum(1 for t in sweep.trials if t["cached"]),
+        "websocket": f"/ws/sweeps/{sweep.sweep_id}"
+    }
+
+@router.get("/sweeps/{sweep_id}")
+async def get_sweep(sweep_id: str):
+    """Get sweep progress and the results table of finished trials"""
+    sweep = sweep_runner.get(sweep_id)
+    if sweep is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    return sweep.to_dict()
+
+@router.post("/sweeps/{sweep_id}/cancel")
+async def cancel_sweep(sweep_id: str):
+    """Cancel trials of a sweep that have not started yet"""
+    if sweep_runner.get(sweep_id) is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    if not sweep_runner.cancel(sweep_id):
+        raise HTTPException(status_code=400, detail="Sweep is not running")
+    return {"message": "Sweep cancellation requested", "sweep_id": sweep_id}
@@ -0,0 +1,40 @@
+
+import json
+from fastapi import APIRouter, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+
+from core.tracing import tracer
+
+router = APIRouter()
+
+@router.post("/trace/start")
+async def start_trace(seconds: Optional[float] = Query(None, gt=0, le=3600),
+                      capacity: Optional[int] = Query(None, ge=1000, le=2000000)):
+    """Start recording a timeline, for the given number of seconds or until stopped.
+
+    Restarting clears the previously recorded events.
+    """
+    tracer.start(seconds=seconds, capacity=capacity)
+    return tracer.get_stats()
+
+@router.post("/trace/stop")
+async def stop_trace():
+    """Stop recording; the events stay available for export"""
+    tracer.stop()
+    return tracer.get_stats()
+
+@router.get("/trace/status")
+async def get_trace_status():
+    """Whether tracing is on, how many events are held and how long it has left"""
+    return tracer.get_stats()
+
+@router.get("/trace")
+async def export_trace():
+    """Download the recorded events as Chrome/Perfetto trace-event JSON"""
+    if tracer.started_at is None:
+        raise HTTPException(status_code=404, detail="No trace has been recorded")
+    # Serialising a full ring takes a while; keep it off the event loop
+    body = await run_in_threadpool(lambda: json.dumps(tracer.export()))
+    return Response(body, media_type="application/json",
+                    headers={"Content-Disposition": "attachment; filename=trace.json"})
@@ -1,5 +1,6 @@
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import os
@@ -8,6 +9,7 @@ router = APIRouter()
 
 # Import from main module to access training_manager
 from main import training_manager
+from core import run_state
 
 class TrainingConfig(BaseModel):
     episodes: int = 500
@@ -18,6 +20,26 @@ class TrainingConfig(BaseModel):
     epsilon_decay: float = 0.995
     memory_size: int = 10000
     batch_size: int = 32
+    num_envs: int = 1
+    vector_mode: str = "sync"  # "sync" or "async" (one subprocess per env)
+    prioritized_replay: bool = False
+    per_alpha: float = 0.6
+    per_beta: float = 0.4
+    compact_replay: bool = False  # Store each observation once, bit-packed done flags
+    replay_obs_dtype: str = "float32"  # "float32" or "float16" (compact replay only)
+    inference_backend: str = "torch"  # "torch" or "numpy" for action selection
+    inference_sync_interval: int = 1  # Optimizer steps between numpy weight syncs
+    distributed: bool = False  # Actor processes + continuous learner
+    num_actors: int = 2
+    weight_sync_interval: int = 50  # Learner steps between weight broadcasts
+    update_mode: str = "episode"  # Learn at episode end or per env step
+    updates_per_episode: int = 1  # Gradient steps per episode ("episode" mode)
+    updates_per_step: float = 0.25  # Gradient steps per env step ("step" mode)
+    num_minibatches: int = 1  # Minibatches drawn per replay sample
+    learning_starts: int = 0  # Transitions before learning (at least batch_size)
+    checkpoint_interval: int = 100  # Episodes between background checkpoints (0 = off)
+    checkpoint_keep_last: int = 3
+    checkpoint_keep_best: int = 2  # By average reward at checkpoint time
 
 @router.post("/training/start")
 async def start_training(config: TrainingConfig):
@@ -63,13 +85,76 @@ async def test_agent(render_video: bool = False):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/training/evaluate")
+async def evaluate_agent(n_episodes: int = 100, num_envs: int = 8,
+                         vector_mode: str = "sync", seed: Optional[int] = None):
+    """Evaluate the greedy policy over many episodes and summarise the rewards"""
+    if not training_manager.agent:
+        raise HTTPException(status_code=400, detail="No trained agent available")
+    if n_episodes < 1 or num_envs < 1 or vector_mode not in ("sync", "async"):
+        raise HTTPException(status_code=400, detail="Invalid evaluation parameters")
+
+    try:
+        # Runs off the event loop; training can continue meanwhile
+        return await run_in_threadpool(
+            training_manager.evaluate_agent, n_episodes, num_envs, vector_mode, seed
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/training/checkpoint")
+async def save_run(name: str):
+    """Save a resumable run (weights, optimizer, replay buffer, RNG states, stats)"""
+    if not training_manager.agent:
+        raise HTTPException(status_code=400, detail="No agent to save")
+
+    try:
+        # May wait for the training thread to reach an episode boundary
+        return await run_in_threadpool(training_manager.save_run, name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/training/runs")
+async def list_runs():
+    """List saved resumable runs"""
+    return {"runs": run_state.list_runs(training_manager.runs_dir)}
+
+@router.post("/training/resume")
+async def resume_training(name: str, episodes: Optional[int] = None):
+    """Restore a saved run and continue training it up to episodes (default: its config)"""
+    if training_manager.is_training:
+        raise HTTPException(status_code=400, detail="Training already in progress")
+
+    try:
+        resumed = await run_in_threadpool(training_manager.resume_run, name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    total = episodes or resumed["config"].get("episodes", 500)
+    training_manager.start_training(total)
+    return {"message": "Training resumed", "total_episodes": total, **resumed}
+
 @router.get("/training/stats")
-async def get_training_stats():
-    """Get detailed training statistics"""
-    stats = training_manager.get_training_status()["stats"]
+async def get_training_stats(start: Optional[int] = Query(None, ge=1),
+                             end: Optional[int] = Query(None, ge=1),
+                             points: int = Query(500, ge=2, le=5000)):
+    """Get training statistics with the reward and loss series for episodes start..end.
+
+    Each series has at most ``points`` points: raw values when few enough,
+    otherwise min/max/mean rollups or LTTB-downsampled values with the
+    min/max envelope they stand for.
+    """
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    stats = training_manager.training_stats
     return {
-        "episode_rewards": stats.get("episode_rewards", []),
-        "losses": stats.get("losses", []),
+        "episode_rewards": training_manager.query_metrics("episode_rewards", start, end, points),
+        "losses": training_manager.query_metrics("losses", start, end, points),
         "current_episode": stats.get("episode", 0),
         "total_episodes": stats.get("total_episodes", 0),
         "average_reward": stats.get("average_reward", 0),
@@ -0,0 +1,75 @@
+
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Optional, Tuple
+import os
+
+from config import Config
+
+router = APIRouter()
+
+CHUNK_SIZE = 64 * 1024
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=start-end' range into inclusive offsets, None if unsatisfiable"""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = size - int(end_text)
+            end = size - 1
+    except ValueError:
+        return None
+
+    start, end = max(0, start), min(end, size - 1)
+    if start > end:
+        return None
+    return start, end
+
+def iter_file(filepath: str, start: int, end: int):
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@router.get("/videos/{filename}")
+async def stream_video(filename: str, range: Optional[str] = Header(None)):
+    """Serve a rendered video, honouring HTTP Range requests for seeking"""
+    filepath = os.path.join(Config.VIDEOS_DIR, os.path.basename(filename))
+    if not os.path.isfile(filepath):
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    size = os.path.getsize(filepath)
+    if range is None:
+        return FileResponse(filepath, media_type="video/mp4", headers={"Accept-Ranges": "bytes"})
+
+    byte_range = parse_range(range, size)
+    if byte_range is None:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        iter_file(filepath, start, end),
+        status_code=206,
+        media_type="video/mp4",
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1)
+        }
+    )
@@ -16,6 +16,7 @@ import logging
 from collections import deque
 
 from core.dqn_agent import DQNAgent, DoubleDQNAgent
+from core.video_encoder import VideoEncoder
 
 logger = logging.getLogger(__name__)
 
@@ -242,60 +243,40 @@ class TrainingManager:
 
         try:
             env = gym.make("CartPole-v1", render_mode="rgb_array")
-            frames = []
-
-            state, _ = env.reset()
-            done = False
-            score = 0
+            video_path = self.videos_dir / filename
+            # Frames are encoded on a background thread as they are rendered
+            with VideoEncoder(str(video_path)) as encoder:
+                state, _ = env.reset()
+                done = False
+                score = 0
+                n_frames = 0
 
-            while not done and len(frames) < 500:  # Max 500 frames
-                action = self.agent.act(state, training=False)
-                state, reward, done, truncated, _ = env.step(action)
-                score += reward
+                while not done and n_frames < 500:  # Max 500 frames
+                    action = self.agent.act(state, training=False)
+                    state, reward, done, truncated, _ = env.step(action)
+                    score += reward
 
-                # Capture frame
-                frame = env.render()
-                frames.append(frame)
+                    # Capture frame
+                    encoder.write(env.render())
+                    n_frames += 1
 
-                if truncated:
-                    done = True
+                    if truncated:
+                        done = True
 
             env.close()
 
-            # Save video
-            if frames:
-                video_path = self.videos_dir / filename
-                self._save_video(frames, str(video_path))
-
-                return {
-                    "status": "success", 
-                    "filepath": str(video_path),
-                    "score": score,
-                    "frames": len(frames)
-                }
-            else:
-                return {"status": "error", "message": "No frames captured"}
+            return {
+                "status": "success",
+                "filepath": str(video_path),
+                "video_url": f"/api/videos/{filename}",
+                "score": score,
+                "frames": n_frames
+            }
 
         except Exception as e:
             logger.error(f"Error generating video: {e}")
             return {"status": "error", "message": str(e)}
 
-    def _save_video(self, frames, filepath, fps=30):
-        """Save frames as video file"""
-        if not frames:
-            return
-
-        height, width, layers = frames[0].shape
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(filepath, fourcc, fps, (width, height))
-
-        for frame in frames:
-            # Convert RGB to BGR for OpenCV
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            video_writer.write(frame_bgr)
-
-        video_writer.release()
-
     def get_available_models(self):
         """Get list of available saved models"""
         models = []
@@ -7,6 +7,8 @@ import json
 import asyncio
 import logging
 
+from core.websocket_manager import ClientConnection
+
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
@@ -14,6 +16,8 @@ class ConnectionManager:
 
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        # Per-connection bounded send queue and writer task
+        self.clients: Dict[WebSocket, ClientConnection] = {}
         self.update_interval = 1.0  # seconds
         self.is_broadcasting = False
 
@@ -21,6 +25,7 @@ class ConnectionManager:
         """Accept a new WebSocket connection"""
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.clients[websocket] = ClientConnection(websocket, None, self._evict)
         logger.info(f"New WebSocket connection. Total: {len(self.active_connections)}")
 
         # Start broadcasting if first connection
@@ -31,34 +36,31 @@ class ConnectionManager:
         """Remove a WebSocket connection"""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            client.stop()
         logger.info(f"WebSocket disconnected. Remaining: {len(self.active_connections)}")
 
+    def _evict(self, client: ClientConnection):
+        """Drop a connection whose sends failed or fell too far behind"""
+        logger.warning(f"Evicting WebSocket client (lag {client.lag:.1f}s, dropped {client.dropped})")
+        client.close()
+        self.disconnect(client.websocket)
+
     async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
         """Send message to a specific WebSocket"""
-        try:
-            await websocket.send_text(json.dumps(message))
-        except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.enqueue(json.dumps(message), droppable=False)
 
     async def broadcast(self, message: Dict[str, Any]):
-        """Broadcast message to all connected WebSockets"""
+        """Queue message for every connected WebSocket without waiting on slow clients"""
         if not self.active_connections:
             return
 
         message_str = json.dumps(message)
-        disconnected = []
-
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message_str)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
-
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection)
+        for client in list(self.clients.values()):
+            client.enqueue(message_str)
 
     async def broadcast_updates(self):
         """Continuously broadcast training updates"""
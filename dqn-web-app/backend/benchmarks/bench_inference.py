@@ -0,0 +1,60 @@
+"""
+Per-step action selection latency of the torch and NumPy policy backends
+
+Run from the backend directory:
+    python -m benchmarks.bench_inference --batch-sizes 1 8 64
+"""
+import argparse
+import time
+import numpy as np
+import torch
+
+from core.dqn_agent import DQNNetwork
+from core.numpy_policy import NumpyPolicy
+
+def torch_act(network, states):
+    with torch.inference_mode():
+        return network(torch.as_tensor(states, dtype=torch.float32)).argmax(1).numpy()
+
+def latency_us(fn, states, iterations: int) -> float:
+    """Mean microseconds per call of fn(states)"""
+    for _ in range(min(100, iterations)):
+        fn(states)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(states)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def run(batch_sizes, iterations: int, state_size: int = 4, action_size: int = 2):
+    network = DQNNetwork(state_size, 64, action_size).eval()
+    numpy_policy = NumpyPolicy(network)
+    rng = np.random.default_rng(0)
+
+    results = {}
+    for n in batch_sizes:
+        states = rng.standard_normal((n, state_size), dtype=np.float32)
+        assert (torch_act(network, states) == numpy_policy.act_batch(states)).all()
+        results[n] = {
+            "torch": latency_us(lambda s: torch_act(network, s), states, iterations),
+            "numpy": latency_us(numpy_policy.act_batch, states, iterations)
+        }
+    results["sync"] = latency_us(lambda _: numpy_policy.sync(network), None, iterations)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=1, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    results = run(args.batch_sizes, args.iterations)
+    print(f"{'batch':>6} {'torch us':>10} {'numpy us':>10} {'speedup':>8}")
+    for n in args.batch_sizes:
+        torch_us, numpy_us = results[n]["torch"], results[n]["numpy"]
+        print(f"{n:>6} {torch_us:10.1f} {numpy_us:10.1f} {torch_us / numpy_us:7.1f}x")
+    print(f"weight sync: {results['sync']:.1f} us")
+
+if __name__ == "__main__":
+    main()
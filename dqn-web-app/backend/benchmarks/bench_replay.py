@@ -0,0 +1,77 @@
+"""
+Sample/update throughput of the replay buffers at large capacity
+
+Run from the backend directory:
+    python -m benchmarks.bench_replay --capacity 1000000
+"""
+import argparse
+import time
+import numpy as np
+
+from core.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, CompactReplayBuffer
+
+def fill(buffer, state_size: int, chunk: int = 100000):
+    """Fill the buffer to capacity with one random trajectory"""
+    rng = np.random.default_rng(0)
+    state = rng.standard_normal(state_size, dtype=np.float32)
+    for start in range(0, buffer.capacity, chunk):
+        n = min(chunk, buffer.capacity - start)
+        observations = np.vstack([state, rng.standard_normal((n, state_size), dtype=np.float32)])
+        buffer.add_batch(observations[:-1], rng.integers(2, size=n), rng.random(n),
+                         observations[1:], rng.random(n) < 0.05, streams=0)
+        state = observations[-1]
+
+def timed(fn, iterations: int) -> float:
+    """Return calls per second of fn over the given number of iterations"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+def run(capacity: int, batch_size: int, iterations: int, state_size: int = 4):
+    rng = np.random.default_rng(1)
+    results = {}
+    footprint = {}
+
+    uniform = ReplayBuffer(capacity, state_size)
+    fill(uniform, state_size)
+    results["uniform_sample"] = timed(lambda: uniform.sample(batch_size), iterations)
+    footprint["uniform"] = uniform.bytes_per_transition
+
+    for dtype in ("float32", "float16"):
+        compact = CompactReplayBuffer(capacity, state_size, obs_dtype=dtype)
+        fill(compact, state_size)
+        results[f"compact_{dtype}_sample"] = timed(lambda: compact.sample(batch_size), iterations)
+        footprint[f"compact_{dtype}"] = compact.bytes_per_transition
+
+    prioritized = PrioritizedReplayBuffer(capacity, state_size)
+    fill(prioritized, state_size)
+    indices = prioritized.sample_indices(batch_size)
+    results["prioritized_sample"] = timed(
+        lambda: prioritized.gather(prioritized.sample_indices(batch_size)), iterations
+    )
+    results["prioritized_weights"] = timed(
+        lambda: prioritized.importance_weights(indices), iterations
+    )
+    results["prioritized_update"] = timed(
+        lambda: prioritized.update_priorities(indices, rng.random(batch_size)), iterations
+    )
+    return results, footprint
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--capacity", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    results, footprint = run(args.capacity, args.batch_size, args.iterations)
+    print(f"capacity={args.capacity} batch_size={args.batch_size}")
+    for name, calls_per_sec in results.items():
+        print(f"{name:>22}: {calls_per_sec:10.0f} batches/s "
+              f"{calls_per_sec * args.batch_size:12.0f} transitions/s")
+    for name, size in footprint.items():
+        print(f"{name:>22}: {size:10.1f} bytes/transition")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Hot-path micro-benchmarks with JSON baselines and regression checks
+
+Run from the backend directory:
+    python -m benchmarks.bench_suite --save-baseline     # record benchmarks/baseline.json
+    python -m benchmarks.bench_suite --baseline          # compare, exit 1 on regressions
+    python -m benchmarks.bench_suite --only act replay --quick
+
+Each metric is the median of --repeats runs. Baselines depend on the
+machine, library versions and --threads, so compare only against one
+recorded under the same conditions.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+import torch
+
+from core.dqn_agent import DQNAgent
+from core.training_manager import TrainingManager
+from core.websocket_manager import WebSocketManager
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+STATE_SIZE = 4
+ACTION_SIZE = 2
+
+def seed_everything(seed: int = 0):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+def per_call_us(fn: Callable, iterations: int) -> float:
+    """Mean microseconds per call of fn after a short warm-up"""
+    for _ in range(min(100, iterations)):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def per_second(fn: Callable, iterations: int, items: int = 1) -> float:
+    """Items processed per second when fn handles items per call"""
+    return 1e6 * items / per_call_us(fn, iterations)
+
+def make_agent(memory_size: int = 10000, **kwargs) -> DQNAgent:
+    return DQNAgent(STATE_SIZE, ACTION_SIZE, memory_size=memory_size, **kwargs)
+
+def fill_memory(agent: DQNAgent, n: int, chunk: int = 100000):
+    """Add n random transitions (one trajectory, done 5% of the time)"""
+    rng = np.random.default_rng(0)
+    state = rng.standard_normal(STATE_SIZE, dtype=np.float32)
+    for start in range(0, n, chunk):
+        k = min(chunk, n - start)
+        observations = np.vstack([state, rng.standard_normal((k, STATE_SIZE), dtype=np.float32)])
+        agent.remember_batch(observations[:-1], rng.integers(ACTION_SIZE, size=k), rng.random(k),
+                             observations[1:], rng.random(k) < 0.05)
+        state = observations[-1]
+
+class Suite:
+    """Collects named metrics as {"value", "unit", "better"}; value is the median of repeats"""
+
+    def __init__(self, repeats: int, quick: bool):
+        self.repeats = repeats
+        self.quick = quick
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, measure: Callable[[], float], unit: str, better: str):
+        self.record_all(lambda: {name: measure()}, {name: (unit, better)})
+
+    def record_all(self, measure: Callable[[], Dict[str, float]], metrics: Dict[str, tuple]):
+        """Several metrics from one measurement; metrics maps name to (unit, better)"""
+        samples = []
+        for _ in range(self.repeats):
+            # As timeit does, keep collector pauses out of the timings
+            gc.collect()
+            gc.disable()
+            try:
+                samples.append(measure())
+            finally:
+                gc.enable()
+        for name, (unit, better) in metrics.items():
+            value = statistics.median(sample[name] for sample in samples)
+            self.results[name] = {"value": value, "unit": unit, "better": better}
+            print(f"{name:>44}: {value:14.2f} {unit}", flush=True)
+
+    def scale(self, full: int, quick: int) -> int:
+        return quick if self.quick else full
+
+def bench_act(suite: Suite):
+    """DQNAgent.act / act_batch latency of the greedy policy"""
+    states = np.random.default_rng(0).standard_normal((64, STATE_SIZE), dtype=np.float32)
+    iterations = suite.scale(5000, 1000)
+    for backend in ("torch", "numpy"):
+        seed_everything()
+        agent = make_agent(epsilon=0.0, inference_backend=backend)
+        suite.record(f"act.{backend}.single_us",
+                     lambda: per_call_us(lambda: agent.act(states[0]), iterations), "us", "lower")
+        for n in (8, 64):
+            suite.record(f"act.{backend}.batch_{n}_us",
+                         lambda: per_call_us(lambda: agent.act_batch(states[:n], greedy=True), iterations),
+                         "us", "lower")
+
+def bench_replay(suite: Suite):
+    """DQNAgent.replay gradient steps per second from full buffers of several sizes"""
+    sizes = (1000, 10000) if suite.quick else (1000, 100000, 1000000)
+    iterations = suite.scale(500, 100)
+    for prioritized in (False, True):
+        kind = "prioritized" if prioritized else "uniform"
+        for size in sizes:
+            seed_everything()
+            agent = make_agent(memory_size=size, prioritized_replay=prioritized)
+            fill_memory(agent, size)
+            suite.record(f"replay.{kind}_{size}.grad_steps_per_sec",
+                         lambda: per_second(lambda: agent.replay(decay_epsilon=False), iterations),
+                         "steps/s", "higher")
+
+def bench_remember(suite: Suite):
+    """Replay insert rate of remember (one transition) and remember_batch"""
+    rng = np.random.default_rng(0)
+    batch = 64
+    states = rng.standard_normal((batch + 1, STATE_SIZE), dtype=np.float32)
+    actions, rewards = rng.integers(ACTION_SIZE, size=batch), rng.random(batch)
+    dones = np.zeros(batch, dtype=bool)
+    iterations = suite.scale(20000, 10000)
+    for name, options in (("uniform", {}), ("compact", {"compact_replay": True}),
+                          ("prioritized", {"prioritized_replay": True})):
+        agent = make_agent(memory_size=100000, **options)
+        step = [0]
+
+        def remember_step():
+            # Walk one trajectory, ending an episode every batch steps as in training
+            i = step[0] % batch
+            agent.remember(states[i], actions[i], rewards[i], states[i + 1], i == batch - 1)
+            step[0] += 1
+
+        suite.record(f"remember.{name}.single_per_sec",
+                     lambda: per_second(remember_step, iterations), "transitions/s", "higher")
+        suite.record(f"remember.{name}.batch_{batch}_per_sec",
+                     lambda: per_second(lambda: agent.remember_batch(states[:-1], actions, rewards,
+                                                                     states[1:], dones),
+                                        iterations // 10, batch), "transitions/s", "higher")
+
+def bench_training_loop(suite: Suite):
+    """Env steps per second of whole training episodes through TrainingManager._training_loop"""
+    episodes = suite.scale(40, 10)
+    configs = {
+        "episode_updates": {},
+        "step_updates": {"update_mode": "step", "updates_per_step": 0.25},
+        "vector_4": {"num_envs": 4}
+    }
+    for name, config in configs.items():
+        def run():
+            seed_everything()
+            manager = TrainingManager()
+            manager.initialize_agent({"episodes": episodes, **config})
+            start = time.perf_counter()
+            manager.start_training(episodes)
+            manager.training_thread.join()
+            elapsed = time.perf_counter() - start
+            manager.env.close()
+            return manager.training_stats["total_steps"] / elapsed
+        suite.record(f"training_loop.{name}.steps_per_sec", run, "steps/s", "higher")
+
+class FakeWebSocket:
+    """Accepts every message immediately, like a client on a fast local connection"""
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        pass
+
+    async def close(self):
+        pass
+
+def training_update_message() -> Dict[str, Any]:
+    """A training_update delta of the size sent during training"""
+    rng = np.random.default_rng(0)
+    return {"type": "training_update", "data": {
+        "seq": 1000, "base_seq": 999, "episode": 1000, "total_episodes": 5000,
+        "current_reward": 187.0, "average_reward": 143.2, "epsilon": 0.05, "loss": 0.731,
+        "total_steps": 143200, "grad_steps": 25000, "grad_steps_per_sec": 812.4,
+        "samples_per_sec": 25996.8,
+        "episode_rewards": rng.random(10).tolist(), "episode_rewards_offset": 990,
+        "losses": rng.random(10).tolist(), "losses_offset": 990
+    }}
+
+async def fan_out(n_clients: int, messages: int) -> Dict[str, float]:
+    """Broadcast messages to n_clients fake sockets and wait until every copy is sent"""
+    manager = WebSocketManager(max_queue=messages + 1)
+    sockets = [FakeWebSocket() for _ in range(n_clients)]
+    for websocket in sockets:
+        await manager.connect(websocket)
+    clients = list(manager.clients.values())
+    message = training_update_message()
+
+    enqueue = 0.0
+    start = time.perf_counter()
+    for _ in range(messages):
+        t0 = time.perf_counter()
+        await manager.broadcast(message)
+        enqueue += time.perf_counter() - t0
+    while any(client.sent < messages for client in clients):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    for websocket in sockets:
+        manager.disconnect(websocket)
+    return {"broadcast_us": enqueue / messages * 1e6, "deliveries_per_sec": n_clients * messages / elapsed}
+
+def bench_broadcast(suite: Suite):
+    """WebSocketManager.broadcast call latency and delivered messages per second"""
+    messages = suite.scale(200, 50)
+    for n_clients in (1, 10, 100, 1000):
+        prefix = f"broadcast.clients_{n_clients}"
+
+        def measure():
+            result = asyncio.run(fan_out(n_clients, messages))
+            return {f"{prefix}.{key}": value for key, value in result.items()}
+
+        suite.record_all(measure, {f"{prefix}.broadcast_us": ("us", "lower"),
+                                   f"{prefix}.deliveries_per_sec": ("messages/s", "higher")})
+
+def bench_save_load(suite: Suite):
+    """DQNAgent.save_model / load_model time"""
+    iterations = suite.scale(50, 10)
+    seed_everything()
+    agent = make_agent()
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "model.pth")
+        suite.record("save_load.save_model_ms",
+                     lambda: per_call_us(lambda: agent.save_model(filepath), iterations) / 1000,
+                     "ms", "lower")
+        suite.record("save_load.load_model_ms",
+                     lambda: per_call_us(lambda: agent.load_model(filepath), iterations) / 1000,
+                     "ms", "lower")
+
+BENCHMARKS = {
+    "act": bench_act,
+    "replay": bench_replay,
+    "remember": bench_remember,
+    "training_loop": bench_training_loop,
+    "broadcast": bench_broadcast,
+    "save_load": bench_save_load
+}
+
+def environment(threads: int, quick: bool) -> Dict[str, Any]:
+    """Conditions a baseline was recorded under"""
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": threads,
+        "quick": quick
+    }
+
+def run(names: List[str], repeats: int, quick: bool) -> Dict[str, Dict[str, Any]]:
+    suite = Suite(repeats, quick)
+    for name in names:
+        print(f"[{name}] {BENCHMARKS[name].__doc__}", flush=True)
+        BENCHMARKS[name](suite)
+    return suite.results
+
+def compare(baseline: Dict[str, Dict[str, Any]], results: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[Dict[str, Any]]:
+    """Per-metric change against the baseline; "regression" when worse by more than threshold"""
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["value"], result["value"]
+        change = (after - before) / before if before else 0.0
+        # Positive improvement means better, whichever direction that is
+        improvement = change if result["better"] == "higher" else -change
+        status = "ok"
+        if improvement < -threshold:
+            status = "regression"
+        elif improvement > threshold:
+            status = "improved"
+        rows.append({"name": name, "baseline": before, "current": after,
+                     "change": change, "unit": result["unit"], "status": status})
+    return rows
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]], env: Dict[str, Any]):
+    """Write results to path, keeping metrics of benchmarks that were not rerun"""
+    existing = load_baseline(path)
+    merged = dict(existing["results"]) if existing and existing.get("environment") == env else {}
+    merged.update(results)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"recorded": time.time(), "environment": env, "results": merged}, f, indent=2)
+    os.replace(temp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="smaller buffers and fewer iterations")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=1, help="torch intra-op threads")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"compare against a baseline (default path: {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help="write the results as a baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument("--output", help="also write the results as JSON here")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    env = environment(args.threads, args.quick)
+    results = run(args.only, args.repeats, args.quick)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": env, "results": results}, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            print(f"No baseline at {args.baseline}; record one with --save-baseline")
+            sys.exit(2)
+        if baseline.get("environment") != env:
+            print("Warning: baseline was recorded under different conditions:")
+            for key in env:
+                if baseline.get("environment", {}).get(key) != env[key]:
+                    print(f"  {key}: {baseline.get('environment', {}).get(key)} -> {env[key]}")
+        rows = compare(baseline["results"], results, args.threshold)
+        print(f"\n{'metric':>44} {'baseline':>14} {'current':>14} {'change':>8}")
+        for row in rows:
+            flag = {"regression": "  REGRESSION", "improved": "  improved"}.get(row["status"], "")
+            print(f"{row['name']:>44} {row['baseline']:14.2f} {row['current']:14.2f} "
+                  f"{row['change']:+8.1%}{flag}")
+        regressions = [row for row in rows if row["status"] == "regression"]
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, env)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
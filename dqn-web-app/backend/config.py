@@ -20,15 +20,42 @@ class Config:
         "epsilon_decay": 0.995
     }
 
+    # Training thread -> event loop bridge: max update rate and queue bound
+    UPDATE_INTERVAL_MS = int(os.getenv("UPDATE_INTERVAL_MS", 100))
+    EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", 10000))
+
+    # Session scheduler: concurrent training worker processes
+    MAX_CONCURRENT_SESSIONS = int(os.getenv("MAX_CONCURRENT_SESSIONS", os.cpu_count() or 1))
+
+    # Sweep engine: parallel trial worker processes
+    MAX_SWEEP_WORKERS = int(os.getenv("MAX_SWEEP_WORKERS", os.cpu_count() or 1))
+
+    # In-memory LRU cache of loaded checkpoints and policies
+    POLICY_CACHE_MB = int(os.getenv("POLICY_CACHE_MB", 256))
+
+    # Inference endpoint micro-batching
+    PREDICT_MAX_BATCH = int(os.getenv("PREDICT_MAX_BATCH", 64))
+    PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", 2))
+
+    # Run history: seconds between flushes of buffered per-episode points
+    HISTORY_FLUSH_SECONDS = float(os.getenv("HISTORY_FLUSH_SECONDS", 5))
+
+    # Trace timeline: events kept in the in-memory ring
+    TRACE_BUFFER_EVENTS = int(os.getenv("TRACE_BUFFER_EVENTS", 100000))
+
     # Paths
     MODELS_DIR = "models/saved"
+    SWEEPS_DIR = "models/sweeps"
+    MODEL_INDEX_PATH = "models/registry.db"
+    RUNS_DIR = "models/runs"
+    HISTORY_DIR = "models/history"
     STATIC_DIR = "static"
     VIDEOS_DIR = "static/videos"
 
     @classmethod
     def ensure_directories(cls):
         """Ensure all required directories exist"""
-        for directory in [cls.MODELS_DIR, cls.STATIC_DIR, cls.VIDEOS_DIR]:
+        for directory in [cls.MODELS_DIR, cls.SWEEPS_DIR, cls.RUNS_DIR, cls.HISTORY_DIR, cls.STATIC_DIR, cls.VIDEOS_DIR]:
             os.makedirs(directory, exist_ok=True)
 
 # Initialize directories on import
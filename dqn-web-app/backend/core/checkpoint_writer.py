@@ -0,0 +1,134 @@
+
+import os
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, List
+
+import torch
+
+from .tracing import tracer
+
+class CheckpointWriter:
+    """Writes checkpoint snapshots to disk on a background thread.
+
+    ``submit`` takes an in-memory snapshot (state-dict copies) and returns
+    immediately; if ``max_pending`` snapshots are already waiting the new one
+    is skipped rather than blocking training. Each file is written under a
+    ``.tmp`` name, fsynced and renamed into place, so a partial ``.pth`` file
+    never appears in ``directory``.
+
+    After each write the retention policy keeps the ``keep_last`` most
+    recent and the ``keep_best`` highest-scoring checkpoints written by this
+    writer and deletes the rest.
+    """
+
+    def __init__(self, directory: str, prefix: str = "checkpoint", keep_last: int = 3,
+                 keep_best: int = 2, max_pending: int = 2,
+                 on_written: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 on_removed: Optional[Callable[[str], None]] = None):
+        self.directory = directory
+        self.prefix = prefix
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.on_written = on_written
+        self.on_removed = on_removed
+        self.checkpoints: List[Dict[str, Any]] = []
+
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.removed = 0
+        self.last_write_seconds = 0.0
+        self.error: Optional[str] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, state: Dict[str, Any], episode: int, score: float,
+               metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue a snapshot for writing; returns False if it was skipped"""
+        item = {"state": state, "episode": episode, "score": score, "metadata": metadata or {}}
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.skipped += 1
+            return False
+        return True
+
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            filepath = os.path.join(self.directory, f"{self.prefix}_episode_{item['episode']}.pth")
+            try:
+                start = time.perf_counter()
+                self._write(item["state"], filepath)
+                end = time.perf_counter()
+                self.last_write_seconds = end - start
+                if tracer.enabled:
+                    tracer.complete("checkpoint_write", "save", start, end, {"episode": item["episode"]})
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                self.error = str(e)
+                print(f"Checkpoint write error: {e}")
+                continue
+
+            entry = {"filepath": filepath, "episode": item["episode"], "score": item["score"]}
+            self.checkpoints = [c for c in self.checkpoints if c["filepath"] != filepath]
+            self.checkpoints.append(entry)
+            if self.on_written:
+                try:
+                    self.on_written(filepath, {**item["metadata"], **entry})
+                except Exception as e:
+                    print(f"Checkpoint listener error: {e}")
+            self._apply_retention()
+
+    def _write(self, state: Dict[str, Any], filepath: str):
+        temp_path = f"{filepath}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                torch.save(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _apply_retention(self):
+        keep = {c["filepath"] for c in self.checkpoints[-self.keep_last:]} if self.keep_last else set()
+        best = sorted(self.checkpoints, key=lambda c: c["score"], reverse=True)[:self.keep_best]
+        keep.update(c["filepath"] for c in best)
+
+        for checkpoint in [c for c in self.checkpoints if c["filepath"] not in keep]:
+            try:
+                os.remove(checkpoint["filepath"])
+            except FileNotFoundError:
+                pass
+            self.removed += 1
+            if self.on_removed:
+                self.on_removed(checkpoint["filepath"])
+        self.checkpoints = [c for c in self.checkpoints if c["filepath"] in keep]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "written": self.written,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "removed": self.removed,
+            "pending": self._queue.qsize(),
+            "last_write_seconds": self.last_write_seconds,
+            "error": self.error,
+            "kept": [dict(c) for c in self.checkpoints]
+        }
@@ -0,0 +1,250 @@
+
+import multiprocessing as mp
+import queue
+import time
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+
+class TransitionPool:
+    """Fixed pool of transition chunks in shared memory.
+
+    Actors take a free slot, write up to ``chunk_size`` transitions into it
+    and hand the slot index to the learner through the ``filled`` queue; the
+    learner copies the chunk into its replay buffer and returns the slot.
+    Only slot indices travel through the queues, and actors block when every
+    slot is in use, which bounds the memory and the learner's backlog.
+    """
+
+    def __init__(self, ctx, n_slots: int, chunk_size: int, state_size: int):
+        self.n_slots = n_slots
+        self.chunk_size = chunk_size
+        self.state_size = state_size
+        rows = n_slots * chunk_size
+        self._raw = {
+            "states": ctx.RawArray("f", rows * state_size),
+            "actions": ctx.RawArray("q", rows),
+            "rewards": ctx.RawArray("f", rows),
+            "next_states": ctx.RawArray("f", rows * state_size),
+            "dones": ctx.RawArray("b", rows),
+        }
+        self.free = ctx.Queue()
+        self.filled = ctx.Queue()
+        for slot in range(n_slots):
+            self.free.put(slot)
+        self._map_arrays()
+
+    def _map_arrays(self):
+        shape = (self.n_slots, self.chunk_size)
+        self.states = np.frombuffer(self._raw["states"], dtype=np.float32).reshape(*shape, self.state_size)
+        self.actions = np.frombuffer(self._raw["actions"], dtype=np.int64).reshape(shape)
+        self.rewards = np.frombuffer(self._raw["rewards"], dtype=np.float32).reshape(shape)
+        self.next_states = np.frombuffer(self._raw["next_states"], dtype=np.float32).reshape(*shape, self.state_size)
+        self.dones = np.frombuffer(self._raw["dones"], dtype=np.bool_).reshape(shape)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in ("states", "actions", "rewards", "next_states", "dones"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._map_arrays()
+
+    def chunk(self, slot: int, count: int):
+        """Views of the first count transitions of a slot"""
+        return (self.states[slot, :count], self.actions[slot, :count], self.rewards[slot, :count],
+                self.next_states[slot, :count], self.dones[slot, :count])
+
+class WeightBroadcast:
+    """Latest learner weights and epsilon in shared memory, tagged with a version"""
+
+    def __init__(self, ctx, network: torch.nn.Module):
+        n_params = sum(p.numel() for p in network.parameters())
+        self._raw = ctx.RawArray("f", n_params)
+        self.version = ctx.RawValue("q", 0)
+        self.epsilon = ctx.RawValue("d", 1.0)
+        self.lock = ctx.Lock()
+        self._map_arrays()
+
+    def _map_arrays(self):
+        self.weights = np.frombuffer(self._raw, dtype=np.float32)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["weights"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._map_arrays()
+
+    def publish(self, network: torch.nn.Module, epsilon: float):
+        with torch.no_grad():
+            flat = parameters_to_vector(network.parameters()).numpy()
+        with self.lock:
+            self.weights[:] = flat
+            self.epsilon.value = epsilon
+            self.version.value += 1
+
+    def fetch(self, network: torch.nn.Module, known_version: int) -> Tuple[int, float]:
+        """Copy newer weights into network; returns the version held and the epsilon"""
+        with self.lock:
+            version = self.version.value
+            epsilon = self.epsilon.value
+            if version != known_version:
+                flat = torch.from_numpy(self.weights.copy())
+        if version != known_version:
+            with torch.no_grad():
+                vector_to_parameters(flat, network.parameters())
+        return version, epsilon
+
+def _run_actor(actor_id: int, env_id: str, hidden_size: int, pool: TransitionPool,
+               weights: WeightBroadcast, results, stop_event, sync_every: int, seed: Optional[int]):
+    """Actor process entry point: roll out episodes with the latest broadcast weights"""
+    import gymnasium as gym
+    from .dqn_agent import DQNNetwork
+    from .numpy_policy import NumpyPolicy
+
+    torch.set_num_threads(1)
+    env = gym.make(env_id)
+    rng = np.random.default_rng(seed)
+    network = DQNNetwork(pool.state_size, hidden_size, env.action_space.n)
+    version, epsilon = weights.fetch(network, -1)
+    policy = NumpyPolicy(network)
+
+    slot, count = None, 0
+
+    def flush():
+        nonlocal slot, count
+        if slot is not None and count:
+            pool.filled.put((slot, count, actor_id))
+            slot, count = None, 0
+
+    try:
+        state, _ = env.reset(seed=seed)
+        episode_return, episode_length, steps = 0.0, 0, 0
+        while not stop_event.is_set():
+            if rng.random() <= epsilon:
+                action = int(rng.integers(env.action_space.n))
+            else:
+                action = policy.act(state)
+            next_state, reward, terminated, truncated, _ = env.step(action)
+            done = terminated or truncated
+
+            if slot is None:
+                while slot is None and not stop_event.is_set():
+                    try:
+                        slot = pool.free.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                if slot is None:
+                    break
+            pool.states[slot, count] = state
+            pool.actions[slot, count] = action
+            pool.rewards[slot, count] = reward
+            pool.next_states[slot, count] = next_state
+            pool.dones[slot, count] = done
+            count += 1
+            if count == pool.chunk_size:
+                flush()
+
+            episode_return += reward
+            episode_length += 1
+            steps += 1
+            state = next_state
+            if done:
+                flush()
+                results.put((actor_id, episode_return, episode_length))
+                state, _ = env.reset()
+                episode_return, episode_length = 0.0, 0
+
+            if steps % sync_every == 0:
+                new_version, epsilon = weights.fetch(network, version)
+                if new_version != version:
+                    version = new_version
+                    policy.sync(network)
+    finally:
+        env.close()
+
+class ActorPool:
+    """Spawned actor processes feeding one learner through a TransitionPool"""
+
+    def __init__(self, network: torch.nn.Module, state_size: int, num_actors: int = 2,
+                 env_id: str = "CartPole-v1", chunk_size: int = 64, slots_per_actor: int = 4,
+                 sync_every: int = 100, seed: Optional[int] = None):
+        self.ctx = mp.get_context("spawn")
+        self.num_actors = max(1, num_actors)
+        self.env_id = env_id
+        self.hidden_size = network.fc1.out_features
+        self.sync_every = sync_every
+        self.seed = seed
+        self.pool = TransitionPool(self.ctx, self.num_actors * slots_per_actor, chunk_size, state_size)
+        self.weights = WeightBroadcast(self.ctx, network)
+        self.results = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        self.processes: List[Any] = []
+
+    def start(self, network: torch.nn.Module, epsilon: float):
+        self.weights.publish(network, epsilon)
+        for actor_id in range(self.num_actors):
+            seed = None if self.seed is None else self.seed + actor_id
+            process = self.ctx.Process(
+                target=_run_actor,
+                args=(actor_id, self.env_id, self.hidden_size, self.pool, self.weights,
+                      self.results, self.stop_event, self.sync_every, seed),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            # Keep releasing slots so an actor blocked on put/get can exit
+            while process.is_alive() and time.monotonic() < deadline:
+                self.drain_transitions(lambda *chunk: None)
+                process.join(timeout=0.05)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+    def alive(self) -> bool:
+        return any(process.is_alive() for process in self.processes)
+
+    def drain_transitions(self, consume, max_chunks: Optional[int] = None) -> int:
+        """Pass ready chunks to consume(states, actions, rewards, next_states, dones, actor_id)"""
+        transitions = 0
+        chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            try:
+                slot, count, actor_id = self.pool.filled.get_nowait()
+            except queue.Empty:
+                break
+            consume(*self.pool.chunk(slot, count), actor_id)
+            self.pool.free.put(slot)
+            transitions += count
+            chunks += 1
+        return transitions
+
+    def drain_episodes(self) -> List[Tuple[int, float, int]]:
+        """Finished episodes as (actor_id, return, length)"""
+        episodes = []
+        while True:
+            try:
+                episodes.append(self.results.get_nowait())
+            except queue.Empty:
+                return episodes
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "num_actors": self.num_actors,
+            "alive": sum(process.is_alive() for process in self.processes),
+            "weights_version": self.weights.version.value,
+            "chunk_size": self.pool.chunk_size,
+            "slots": self.pool.n_slots
+        }
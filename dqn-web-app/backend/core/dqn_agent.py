@@ -1,11 +1,22 @@
 
+import copy
+import os
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
 import random
-from collections import deque
+import time
 import gymnasium as gym
+from .replay_buffer import (ReplayBuffer, PrioritizedReplayBuffer, CompactReplayBuffer,
+                            CompactPrioritizedReplayBuffer)
+from .numpy_policy import NumpyPolicy
+from .instrumentation import instrumentation
+
+# Learner phases inside replay(), exported at /metrics
+_SAMPLE_SECONDS = instrumentation.phase("replay_sample")
+_OPTIMIZE_SECONDS = instrumentation.phase("optimize")
+_PRIORITY_SECONDS = instrumentation.phase("priority_update")
 
 class DQNNetwork(nn.Module):
     def __init__(self, input_size, hidden_size, output_size):
@@ -22,7 +33,10 @@ class DQNNetwork(nn.Module):
 class DQNAgent:
     def __init__(self, state_size, action_size, lr=0.001, gamma=0.95, 
                  epsilon=1.0, epsilon_min=0.01, epsilon_decay=0.995, 
-                 memory_size=10000, batch_size=32):
+                 memory_size=10000, batch_size=32, prioritized_replay=False,
+                 per_alpha=0.6, per_beta=0.4, per_beta_increment=0.001,
+                 inference_backend="torch", inference_sync_interval=1,
+                 compact_replay=False, replay_obs_dtype="float32"):
         self.state_size = state_size
         self.action_size = action_size
         self.lr = lr
@@ -32,69 +46,214 @@ class DQNAgent:
         self.epsilon_decay = epsilon_decay
         self.memory_size = memory_size
         self.batch_size = batch_size
+        self.prioritized_replay = prioritized_replay
 
         # Neural networks
         self.q_network = DQNNetwork(state_size, 64, action_size)
         self.target_network = DQNNetwork(state_size, 64, action_size)
         self.optimizer = optim.Adam(self.q_network.parameters(), lr=lr)
 
-        # Experience replay
-        self.memory = deque(maxlen=memory_size)
+        # Experience replay; the compact layout shares observations between
+        # consecutive transitions and can store them as float16
+        storage = {"obs_dtype": replay_obs_dtype} if compact_replay else {}
+        if prioritized_replay:
+            buffer_class = CompactPrioritizedReplayBuffer if compact_replay else PrioritizedReplayBuffer
+            self.memory = buffer_class(
+                memory_size, state_size, alpha=per_alpha, beta=per_beta,
+                beta_increment=per_beta_increment, **storage
+            )
+        else:
+            buffer_class = CompactReplayBuffer if compact_replay else ReplayBuffer
+            self.memory = buffer_class(memory_size, state_size, **storage)
+
+        # Learner throughput counters
+        self.grad_steps = 0
+        self.samples_trained = 0
+
+        # Action selection state for act_batch
+        self.rng = np.random.default_rng()
+        self._input_buffer = None
+        self._input_tensor = None
+
+        # Optional NumPy copy of the Q-network for action selection,
+        # refreshed every inference_sync_interval optimizer steps
+        if inference_backend not in ("torch", "numpy"):
+            raise ValueError(f"Unknown inference_backend: {inference_backend}")
+        self.inference_backend = inference_backend
+        self.inference_sync_interval = max(1, inference_sync_interval)
+        self.numpy_policy = NumpyPolicy(self.q_network) if inference_backend == "numpy" else None
+        self._steps_since_sync = 0
 
         # Update target network
         self.update_target_network()
 
+    def sync_inference_policy(self):
+        """Refresh the NumPy policy from the current torch weights"""
+        if self.numpy_policy is not None:
+            self.numpy_policy.sync(self.q_network)
+            self._steps_since_sync = 0
+
     def update_target_network(self):
         self.target_network.load_state_dict(self.q_network.state_dict())
 
-    def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+    def remember(self, state, action, reward, next_state, done, stream=0):
+        self.memory.add(state, action, reward, next_state, done, stream)
+
+    def remember_batch(self, states, actions, rewards, next_states, dones, streams=None):
+        self.memory.add_batch(states, actions, rewards, next_states, dones, streams)
 
     def act(self, state):
         if np.random.random() <= self.epsilon:
             return random.randrange(self.action_size)
 
-        state_tensor = torch.FloatTensor(state).unsqueeze(0)
-        q_values = self.q_network(state_tensor)
-        return np.argmax(q_values.cpu().data.numpy())
+        if self.numpy_policy is not None:
+            return self.numpy_policy.act(state)
+
+        with torch.inference_mode():
+            state_tensor = torch.as_tensor(state, dtype=torch.float32).unsqueeze(0)
+            q_values = self.q_network(state_tensor)
+        return int(q_values.argmax(1))
+
+    def _input_batch(self, states):
+        """Copy states into the reusable float32 input buffer and return a tensor view"""
+        n = len(states)
+        if self._input_buffer is None or len(self._input_buffer) < n:
+            self._input_buffer = np.empty((n, self.state_size), dtype=np.float32)
+            self._input_tensor = torch.from_numpy(self._input_buffer)
+
+        np.copyto(self._input_buffer[:n], states, casting="unsafe")
+        return self._input_tensor[:n]
+
+    def act_batch(self, states: np.ndarray, epsilon=None, greedy=False) -> np.ndarray:
+        """Epsilon-greedy actions for a batch of states using one forward pass.
+
+        ``epsilon`` overrides the agent's current exploration rate and
+        ``greedy=True`` disables exploration entirely.
+        """
+        states = np.asarray(states).reshape(-1, self.state_size)
+        n = len(states)
+        epsilon = 0.0 if greedy else (self.epsilon if epsilon is None else epsilon)
+
+        explore = None
+        if epsilon > 0:
+            explore = self.rng.random(n) <= epsilon
+            if explore.all():
+                return self.rng.integers(self.action_size, size=n)
+
+        if self.numpy_policy is not None:
+            actions = self.numpy_policy.act_batch(states)
+        else:
+            with torch.inference_mode():
+                q_values = self.q_network(self._input_batch(states))
+                actions = q_values.argmax(1).numpy()
+
+        if explore is not None and explore.any():
+            random_actions = self.rng.integers(self.action_size, size=n)
+            actions = np.where(explore, random_actions, actions)
+        return actions
 
-    def replay(self):
+    def replay(self, decay_epsilon=True, num_minibatches=1):
+        """Run num_minibatches gradient steps from one vectorized replay sample.
+
+        Indices for all minibatches are drawn and gathered at once, and the
+        target network, which is fixed for the duration, evaluates every
+        next state in a single forward pass. Returns the mean loss.
+        """
         if len(self.memory) < self.batch_size:
             return None
 
-        batch = random.sample(self.memory, self.batch_size)
-        states = torch.FloatTensor([e[0] for e in batch])
-        actions = torch.LongTensor([e[1] for e in batch])
-        rewards = torch.FloatTensor([e[2] for e in batch])
-        next_states = torch.FloatTensor([e[3] for e in batch])
-        dones = torch.BoolTensor([e[4] for e in batch])
+        b = self.batch_size
+        t0 = time.perf_counter()
+        indices = self.memory.sample_indices(b, num_minibatches)
+        states, actions, rewards, next_states, dones = self.memory.gather(indices)
+        t1 = time.perf_counter()
+        _SAMPLE_SECONDS.record(t0, t1)
+
+        with torch.no_grad():
+            next_q_values = self.target_network(next_states).max(1)[0]
+            target_q_values = rewards + (self.gamma * next_q_values * ~dones)
+        if self.prioritized_replay:
+            weights = self.memory.importance_weights(indices, num_minibatches)
+            td_errors = torch.empty(len(indices))
+
+        losses = torch.empty(num_minibatches)
+        for i in range(num_minibatches):
+            batch = slice(i * b, (i + 1) * b)
+            current_q_values = self.q_network(states[batch]).gather(
+                1, actions[batch].unsqueeze(1)
+            ).squeeze(1)
+
+            if self.prioritized_replay:
+                errors = target_q_values[batch] - current_q_values
+                loss = (weights[batch] * errors.pow(2)).mean()
+                td_errors[batch] = errors.detach().abs()
+            else:
+                loss = nn.MSELoss()(current_q_values, target_q_values[batch])
+
+            self.optimizer.zero_grad()
+            loss.backward()
+            self.optimizer.step()
+            losses[i] = loss.detach()
+        t2 = time.perf_counter()
+        _OPTIMIZE_SECONDS.record(t1, t2)
+
+        if self.prioritized_replay:
+            self.memory.update_priorities(indices, td_errors.numpy())
+            _PRIORITY_SECONDS.record(t2, time.perf_counter())
+
+        self.grad_steps += num_minibatches
+        self.samples_trained += num_minibatches * b
 
-        current_q_values = self.q_network(states).gather(1, actions.unsqueeze(1))
-        next_q_values = self.target_network(next_states).max(1)[0].detach()
-        target_q_values = rewards + (self.gamma * next_q_values * ~dones)
+        if self.numpy_policy is not None:
+            self._steps_since_sync += num_minibatches
+            if self._steps_since_sync >= self.inference_sync_interval:
+                self.sync_inference_policy()
 
-        loss = nn.MSELoss()(current_q_values.squeeze(), target_q_values)
+        if decay_epsilon:
+            self.decay_epsilon()
 
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
+        return losses.mean().item()
 
+    def decay_epsilon(self):
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
-        return loss.item()
-
     def save_model(self, filepath):
+        # Write under a temporary name so a partial file never has the final name
+        temp_path = f"{filepath}.tmp"
         torch.save({
             'q_network_state_dict': self.q_network.state_dict(),
             'target_network_state_dict': self.target_network.state_dict(),
             'optimizer_state_dict': self.optimizer.state_dict(),
             'epsilon': self.epsilon
-        }, filepath)
+        }, temp_path)
+        os.replace(temp_path, filepath)
+
+    def checkpoint_state(self):
+        """Detached copy of the save_model checkpoint, safe to write from another thread"""
+        def detached(state_dict):
+            return {key: value.detach().clone() for key, value in state_dict.items()}
+
+        return {
+            'q_network_state_dict': detached(self.q_network.state_dict()),
+            'target_network_state_dict': detached(self.target_network.state_dict()),
+            'optimizer_state_dict': copy.deepcopy(self.optimizer.state_dict()),
+            'epsilon': self.epsilon
+        }
 
     def load_model(self, filepath):
-        checkpoint = torch.load(filepath)
+        checkpoint = torch.load(filepath, map_location="cpu", weights_only=True)
+        self.load_checkpoint(checkpoint)
+
+    def load_checkpoint(self, checkpoint):
+        """Restore networks, optimizer and epsilon from a checkpoint dict.
+
+        Tensors are copied, so a checkpoint shared through a cache is never
+        modified by later training.
+        """
         self.q_network.load_state_dict(checkpoint['q_network_state_dict'])
         self.target_network.load_state_dict(checkpoint['target_network_state_dict'])
-        self.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+        # Optimizer.load_state_dict may keep the given state tensors
+        self.optimizer.load_state_dict(copy.deepcopy(checkpoint['optimizer_state_dict']))
         self.epsilon = checkpoint['epsilon']
+        self.sync_inference_policy()
@@ -0,0 +1,124 @@
+
+import copy
+import time
+from functools import partial
+from typing import Dict, Any, Optional, List
+
+import gymnasium as gym
+import numpy as np
+import torch
+
+from .numpy_policy import NumpyPolicy
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def make_vector_env(env_id: str, num_envs: int, vector_mode: str = "sync"):
+    """Create num_envs copies of env_id behind gymnasium's sync or async vector API"""
+    env_fns = [partial(gym.make, env_id) for _ in range(num_envs)]
+    if vector_mode == "async":
+        return gym.vector.AsyncVectorEnv(env_fns)
+    return gym.vector.SyncVectorEnv(env_fns)
+
+def policy_network(agent) -> torch.nn.Module:
+    """The online Q-network of a backend or notebook agent"""
+    for name in ("q_network", "q_network_local"):
+        network = getattr(agent, name, None)
+        if network is not None:
+            return network
+    raise ValueError("Agent has no q_network")
+
+def frozen_greedy_copy(network: torch.nn.Module) -> torch.nn.Module:
+    """CPU copy of the network in eval mode, detached from further training updates"""
+    frozen = copy.deepcopy(network).cpu().eval()
+    for parameter in frozen.parameters():
+        parameter.requires_grad_(False)
+    return frozen
+
+def summarize_episodes(rewards: List[float], lengths: List[int], wall_time: float,
+                       histogram_bins: int = 10) -> Dict[str, Any]:
+    """Mean/std/percentiles of episode rewards plus an episode length histogram"""
+    rewards = np.asarray(rewards, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    counts, edges = np.histogram(lengths, bins=histogram_bins)
+    total_steps = int(lengths.sum())
+    return {
+        "n_episodes": len(rewards),
+        "mean": float(rewards.mean()),
+        "std": float(rewards.std()),
+        "min": float(rewards.min()),
+        "max": float(rewards.max()),
+        "percentiles": {
+            f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(rewards, PERCENTILES))
+        },
+        "length_histogram": {
+            "bin_edges": edges.tolist(),
+            "counts": counts.tolist()
+        },
+        "mean_length": float(lengths.mean()),
+        "total_steps": total_steps,
+        "wall_time": wall_time,
+        "steps_per_sec": total_steps / wall_time if wall_time > 0 else 0.0,
+        "rewards": rewards.tolist()
+    }
+
+def evaluate_policy(network: torch.nn.Module, n_episodes: int = 100, num_envs: int = 8,
+                    env_id: str = "CartPole-v1", vector_mode: str = "sync",
+                    seed: Optional[int] = None, histogram_bins: int = 10,
+                    backend: str = "torch") -> Dict[str, Any]:
+    """Run n_episodes greedy episodes of a frozen copy of network on fresh vectorized envs.
+
+    Each env runs a fixed quota of episodes so that envs finishing short
+    episodes faster do not bias the sample. ``backend="numpy"`` selects
+    actions with a NumpyPolicy copy instead of torch.
+    """
+    start = time.perf_counter()
+    policy = frozen_greedy_copy(network)
+    numpy_policy = NumpyPolicy(policy) if backend == "numpy" else None
+    num_envs = max(1, min(num_envs, n_episodes))
+    quotas = np.full(num_envs, n_episodes // num_envs)
+    quotas[:n_episodes % num_envs] += 1
+
+    rewards, lengths = [], []
+    envs = make_vector_env(env_id, num_envs, vector_mode)
+    try:
+        states, _ = envs.reset(seed=seed)
+        returns = np.zeros(num_envs)
+        steps = np.zeros(num_envs, dtype=np.int64)
+        finished = np.zeros(num_envs, dtype=np.int64)
+        autoreset = np.zeros(num_envs, dtype=bool)
+
+        while len(rewards) < n_episodes:
+            if numpy_policy is not None:
+                actions = numpy_policy.act_batch(states)
+            else:
+                with torch.inference_mode():
+                    q_values = policy(torch.from_numpy(np.asarray(states, dtype=np.float32)))
+                    actions = q_values.argmax(1).numpy()
+
+            states, step_rewards, terminated, truncated, _ = envs.step(actions)
+            dones = terminated | truncated
+            # Ignore reset-only steps and envs that already met their quota
+            active = ~autoreset & (finished < quotas)
+            returns[active] += step_rewards[active]
+            steps[active] += 1
+
+            for env_index in np.flatnonzero(dones & active):
+                rewards.append(float(returns[env_index]))
+                lengths.append(int(steps[env_index]))
+                finished[env_index] += 1
+                returns[env_index] = 0
+                steps[env_index] = 0
+            autoreset = dones
+    finally:
+        envs.close()
+
+    return summarize_episodes(rewards, lengths, time.perf_counter() - start, histogram_bins)
+
+def evaluate_agent(agent, env=None, n_episodes: int = 100, num_envs: int = 8, **kwargs) -> Dict[str, Any]:
+    """Evaluate an agent's greedy policy; mirrors the notebook's test_agent(agent, env, n_episodes).
+
+    ``env`` is only used to pick the environment id; it is never stepped.
+    """
+    if env is not None and "env_id" not in kwargs:
+        kwargs["env_id"] = env.spec.id
+    return evaluate_policy(policy_network(agent), n_episodes=n_episodes, num_envs=num_envs, **kwargs)
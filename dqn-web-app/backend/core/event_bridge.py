@@ -0,0 +1,118 @@
+
+import asyncio
+import queue
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Tuple
+
+from .tracing import tracer
+
+class EventBridge:
+    """Hands messages from worker threads to the asyncio event loop.
+
+    ``publish`` may be called from any thread and never blocks: messages go
+    into a bounded queue and are dropped (and counted) when it is full. A
+    single consumer task on the server loop drains the queue every
+    ``interval`` seconds, coalesces bursts and awaits
+    ``handler(channel, message)`` for each remaining message.
+
+    Consecutive messages of a type listed in ``mergers`` on the same channel
+    are folded together with ``mergers[type](older, newer)``; a merger may
+    return None to keep both. All other messages are delivered in order.
+    """
+
+    def __init__(self, handler: Callable[[Optional[str], Dict[str, Any]], Awaitable[None]],
+                 interval: float = 0.1, maxsize: int = 10000,
+                 mergers: Optional[Dict[str, Callable]] = None):
+        self.handler = handler
+        self.interval = interval
+        self.mergers = mergers or {}
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.task = None
+
+        self.published = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.max_queue_depth = 0
+
+    def publish(self, channel: Optional[str], message: Dict[str, Any]) -> bool:
+        """Queue a message for the loop; returns False if it was dropped"""
+        self.published += 1
+        try:
+            self.queue.put_nowait((channel, message))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def start(self):
+        """Start the consumer task on the running event loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Deliver anything still queued and stop the consumer task"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self._deliver(self._coalesce(self._drain()))
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._deliver(self._coalesce(self._drain()))
+
+    def _drain(self) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+        depth = self.queue.qsize()
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _coalesce(self, items):
+        batch = []
+        last_index: Dict[Optional[str], int] = {}
+        for channel, message in items:
+            merger = self.mergers.get(message.get("type"))
+            index = last_index.get(channel)
+            if merger is not None and index is not None:
+                previous = batch[index][1]
+                if previous.get("type") == message.get("type"):
+                    merged = merger(previous["data"], message["data"])
+                    if merged is not None:
+                        batch[index] = (channel, {**message, "data": merged})
+                        self.coalesced += 1
+                        continue
+
+            last_index[channel] = len(batch)
+            batch.append((channel, message))
+        return batch
+
+    async def _deliver(self, batch):
+        if not batch:
+            return
+        with tracer.span("deliver", "broadcast", messages=len(batch)):
+            for channel, message in batch:
+                try:
+                    await self.handler(channel, message)
+                    self.delivered += 1
+                except Exception as e:
+                    print(f"Event bridge handler error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "published": self.published,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "delivered": self.delivered,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "interval": self.interval
+        }
@@ -0,0 +1,184 @@
+
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import torch
+
+from .policy_cache import PolicyCache
+
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+class PredictRequest:
+    __slots__ = ("model", "states", "future", "start")
+
+    def __init__(self, model: str, states: np.ndarray, future: asyncio.Future):
+        self.model = model
+        self.states = states
+        self.future = future
+        self.start = time.perf_counter()
+
+class MicroBatcher:
+    """Gathers concurrent predict calls into micro-batches for one forward pass.
+
+    ``predict`` queues the request on the event loop. A consumer task takes
+    the first waiting request, then keeps collecting until ``max_batch_size``
+    states are gathered or ``max_wait`` seconds have passed, and runs one
+    forward pass per model on a dedicated inference thread. Requests that
+    arrive while a batch is running form the next batch.
+
+    Models are saved checkpoint files in ``models_dir`` loaded through the
+    shared policy cache.
+    """
+
+    def __init__(self, policy_cache: PolicyCache, models_dir: str = "models/saved",
+                 max_batch_size: int = 64, max_wait: float = 0.002, latency_window: int = 10000):
+        self.policy_cache = policy_cache
+        self.models_dir = models_dir
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = None
+        self.task = None
+        self.executor = None
+
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=latency_window)
+        self.batch_sizes = deque(maxlen=latency_window)
+
+    def start(self):
+        """Start the batching task on the running event loop"""
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue()
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def model_path(self, model: str) -> str:
+        """Checkpoint path of a model name or filename in models_dir"""
+        filename = model if model.endswith(".pth") else f"{model}.pth"
+        if os.path.basename(filename) != filename:
+            raise ValueError(f"Invalid model name: {model}")
+        filepath = os.path.join(self.models_dir, filename)
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"Model not found: {model}")
+        return filepath
+
+    async def predict(self, model: str, states) -> Tuple[np.ndarray, np.ndarray]:
+        """Q-values and greedy actions for one state or a batch of states"""
+        states = np.asarray(states, dtype=np.float32)
+        if states.ndim == 1:
+            states = states[None, :]
+        if states.ndim != 2 or len(states) == 0:
+            raise ValueError("states must be a state vector or a non-empty list of state vectors")
+        self.model_path(model)
+
+        if self.task is None:
+            self.start()
+        request = PredictRequest(model, states, asyncio.get_running_loop().create_future())
+        self.queue.put_nowait(request)
+        return await request.future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            rows = len(batch[0].states)
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch_size:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        request = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    request = self.queue.get_nowait()
+                batch.append(request)
+                rows += len(request.states)
+
+            results = await loop.run_in_executor(self.executor, self._run_batch, batch)
+            self.batches += 1
+            self.batch_sizes.append(rows)
+            now = time.perf_counter()
+            for request, result in zip(batch, results):
+                self.requests += 1
+                self.latencies.append(now - request.start)
+                if request.future.done():
+                    continue  # Caller went away
+                if isinstance(result, Exception):
+                    self.errors += 1
+                    request.future.set_exception(result)
+                else:
+                    request.future.set_result(result)
+
+    def _run_batch(self, batch: List[PredictRequest]) -> List[Any]:
+        """One forward pass per model over the concatenated states (inference thread)"""
+        results: List[Any] = [None] * len(batch)
+        by_model: Dict[str, List[int]] = {}
+        for index, request in enumerate(batch):
+            by_model.setdefault(request.model, []).append(index)
+
+        for model, indices in by_model.items():
+            try:
+                policy = self.policy_cache.get_policy(self.model_path(model))
+                # Fail only the requests whose states don't fit this model
+                width = policy.fc1.in_features
+                for i in indices:
+                    if batch[i].states.shape[1] != width:
+                        results[i] = ValueError(f"Model {model} expects states of size {width}")
+                indices = [i for i in indices if results[i] is None]
+                if not indices:
+                    continue
+                states = np.concatenate([batch[i].states for i in indices])
+                with torch.inference_mode():
+                    q_values = policy(torch.from_numpy(states)).numpy()
+            except Exception as e:
+                for i in indices:
+                    results[i] = e
+                continue
+
+            start = 0
+            for i in indices:
+                end = start + len(batch[i].states)
+                results[i] = (q_values[start:end], q_values[start:end].argmax(1))
+                start = end
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        latencies = np.asarray(self.latencies) * 1000
+        stats = {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "latency_ms": {}
+        }
+        if len(latencies):
+            stats["latency_ms"] = {
+                f"p{p}": float(v)
+                for p, v in zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES))
+            }
+            stats["latency_ms"]["mean"] = float(latencies.mean())
+        return stats
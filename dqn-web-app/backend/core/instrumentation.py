@@ -0,0 +1,131 @@
+
+from bisect import bisect_left
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from .tracing import tracer
+
+# Latency bucket upper bounds in seconds, 1 µs to 10 s
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+class Histogram:
+    """Bucketed observations in the Prometheus layout (per-bucket counts, sum, count)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the q-quantile"""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return float("inf") if self.counts[-1] else 0.0
+
+class Phase(Histogram):
+    """Latency histogram of a named phase that also feeds the trace timeline"""
+
+    def __init__(self, name: str, buckets=LATENCY_BUCKETS):
+        super().__init__(buckets)
+        self.name = name
+
+    def record(self, start: float, end: float):
+        """Observe a phase that ran from start to end (perf_counter seconds)"""
+        self.observe(end - start)
+        if tracer.enabled:
+            tracer.complete(self.name, "phase", start, end)
+
+class Instrumentation:
+    """Counters, histograms and callback gauges rendered in Prometheus text format.
+
+    Updates take no locks: a counter or histogram is normally updated from
+    a single thread, and a scrape running concurrently may see an
+    observation in ``count`` before it shows in ``sum``, which Prometheus
+    tolerates. Observing costs a ``bisect`` and three increments, cheap
+    enough to leave on around every environment step.
+    """
+
+    def __init__(self, namespace: str = "dqn"):
+        self.namespace = namespace
+        # name -> (type, help, {label items: metric or callable})
+        self.families: Dict[str, Tuple[str, str, Dict[Tuple, Any]]] = {}
+
+    def _child(self, kind: str, name: str, help_text: str, labels: Dict[str, str], factory):
+        name = f"{self.namespace}_{name}"
+        family = self.families.setdefault(name, (kind, help_text, {}))
+        if family[0] != kind:
+            raise ValueError(f"{name} is already registered as a {family[0]}")
+        key = tuple(sorted(labels.items()))
+        if key not in family[2]:
+            family[2][key] = factory()
+        return family[2][key]
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        return self._child("counter", name, help_text, labels, Counter)
+
+    def histogram(self, name: str, help_text: str, buckets=LATENCY_BUCKETS, **labels) -> Histogram:
+        return self._child("histogram", name, help_text, labels, lambda: Histogram(buckets))
+
+    def phase(self, phase: str) -> Phase:
+        """Latency histogram of one phase of the training loop, traced when tracing is on"""
+        return self._child("histogram", "phase_seconds", "Time spent per training-loop phase",
+                           {"phase": phase}, lambda: Phase(phase))
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], Optional[float]], **labels):
+        """Register fn as a gauge read at scrape time; a None result omits the sample"""
+        family = self.families.setdefault(f"{self.namespace}_{name}", ("gauge", help_text, {}))
+        family[2][tuple(sorted(labels.items()))] = fn
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, (kind, help_text, children) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in list(children.items()):
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_number(metric.value)}")
+                elif kind == "gauge":
+                    try:
+                        value = metric()
+                    except Exception:
+                        value = None
+                    if value is not None:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                else:
+                    cumulative = 0
+                    for bound, count in zip(metric.bounds + ["+Inf"], metric.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _number(bound)
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(metric.sum)}")
+                    lines.append(f"{name}_count{_labels(labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+               for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+# Process-wide instance exposed by the /metrics endpoint
+instrumentation = Instrumentation()
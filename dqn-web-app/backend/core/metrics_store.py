@@ -0,0 +1,230 @@
+
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+import numpy as np
+
+class _Ring:
+    """Fixed-capacity columns where appending past capacity overwrites the oldest row"""
+
+    def __init__(self, capacity: int, fields: Dict[str, Any]):
+        self.capacity = int(capacity)
+        self.count = 0
+        self.arrays = {name: np.zeros(self.capacity, dtype=dtype) for name, dtype in fields.items()}
+
+    @property
+    def oldest(self) -> int:
+        """Number of rows that have been overwritten"""
+        return max(0, self.count - self.capacity)
+
+    def append(self, **values):
+        i = self.count % self.capacity
+        for name, value in values.items():
+            self.arrays[name][i] = value
+        self.count += 1
+
+    def ordered(self, first: int = 0) -> Dict[str, np.ndarray]:
+        """Rows from the first-th appended (or the oldest kept) to the newest, oldest first"""
+        first = max(first, self.oldest)
+        positions = np.arange(first, self.count) % self.capacity
+        return {name: array[positions] for name, array in self.arrays.items()}
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"count": self.count,
+                **{name: values.tolist() for name, values in self.ordered().items()}}
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        self.count = int(state["count"])
+        positions = np.arange(self.oldest, self.count) % self.capacity
+        for name, array in self.arrays.items():
+            array[positions] = state[name]
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of n_out points that keep the shape of y(x).
+
+    The first and last points are always kept; every other output point
+    is the one in its bucket forming the largest triangle with the point
+    chosen before it and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:n_out]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+def downsample(columns: Dict[str, np.ndarray], max_points: int) -> Dict[str, np.ndarray]:
+    """Reduce x/mean/min/max columns to max_points with LTTB on the means.
+
+    ``min`` and ``max`` of each kept point become the envelope of the
+    bucket it was chosen from, so spikes stay visible.
+    """
+    n = len(columns["x"])
+    indices = lttb(columns["x"].astype(np.float64), columns["mean"], max_points)
+    starts = np.concatenate(([0], np.linspace(1, n - 1, max_points - 1).astype(np.int64)))[:len(indices)]
+    return {
+        "x": columns["x"][indices],
+        "mean": columns["mean"][indices],
+        "min": np.minimum.reduceat(columns["min"], starts),
+        "max": np.maximum.reduceat(columns["max"], starts)
+    }
+
+def format_points(columns: Dict[str, np.ndarray], resolution: int, method: str) -> Dict[str, Any]:
+    """JSON-ready series; min/max are only included for aggregated points"""
+    result = {
+        "resolution": resolution,
+        "method": method,
+        "episodes": columns["x"].tolist(),
+        "values": columns["mean"].tolist()
+    }
+    if method != "raw":
+        result["min"] = columns["min"].tolist()
+        result["max"] = columns["max"].tolist()
+    return result
+
+class MetricSeries:
+    """One metric as (episode, value) points in fixed memory.
+
+    The latest ``capacity`` points are kept at full resolution. Every point
+    is also folded into ``levels`` rollup rings whose buckets summarise
+    ``factor``, ``factor**2``, ... consecutive points as first episode,
+    min, max and mean, each ring again holding ``capacity`` buckets. With
+    the defaults that is 4096 raw points plus buckets of 10 to 10000
+    points, covering about 40 million episodes in under 1 MB.
+    """
+
+    def __init__(self, capacity: int = 4096, factor: int = 10, levels: int = 4):
+        self.capacity = capacity
+        self.factor = factor
+        self.raw = _Ring(capacity, {"x": np.int64, "y": np.float64})
+        self.rollups = [
+            _Ring(capacity, {"x": np.int64, "min": np.float64, "max": np.float64, "mean": np.float64})
+            for _ in range(levels)
+        ]
+        # Running bucket of each level: [first x, min, max, sum, count]
+        self._open = [None] * levels
+
+    def __len__(self):
+        return self.raw.count
+
+    def append(self, x: int, y: float):
+        x, y = int(x), float(y)
+        self.raw.append(x=x, y=y)
+        for level, ring in enumerate(self.rollups):
+            bucket = self._open[level]
+            if bucket is None:
+                bucket = self._open[level] = [x, y, y, 0.0, 0]
+            bucket[1] = min(bucket[1], y)
+            bucket[2] = max(bucket[2], y)
+            bucket[3] += y
+            bucket[4] += 1
+            if bucket[4] == self.factor ** (level + 1):
+                ring.append(x=bucket[0], min=bucket[1], max=bucket[2], mean=bucket[3] / bucket[4])
+                self._open[level] = None
+
+    def tail(self, n: int) -> np.ndarray:
+        """The last n values (fewer if not that many are kept)"""
+        return self.raw.ordered(self.raw.count - n)["y"]
+
+    def since(self, offset: int) -> Tuple[List[float], int]:
+        """Values appended from the offset-th point on, and the offset they actually start at.
+
+        The start is later than requested when those points were overwritten.
+        """
+        start = max(offset, self.raw.oldest)
+        return self.raw.ordered(start)["y"].tolist(), start
+
+    def _sources(self):
+        """(bucket size, columns) from full resolution to coarsest, each oldest first"""
+        raw = self.raw.ordered()
+        yield 1, {"x": raw["x"], "min": raw["y"], "max": raw["y"], "mean": raw["y"]}, self.raw.oldest == 0
+        for level, ring in enumerate(self.rollups):
+            columns = ring.ordered()
+            bucket = self._open[level]
+            if bucket is not None:
+                # Include the partial bucket so the newest points are represented
+                columns = {
+                    "x": np.append(columns["x"], bucket[0]),
+                    "min": np.append(columns["min"], bucket[1]),
+                    "max": np.append(columns["max"], bucket[2]),
+                    "mean": np.append(columns["mean"], bucket[3] / bucket[4])
+                }
+            yield self.factor ** (level + 1), columns, ring.oldest == 0
+
+    def query(self, start: Optional[int] = None, end: Optional[int] = None,
+              max_points: int = 500) -> Dict[str, Any]:
+        """Points with start <= episode <= end, at most max_points of them.
+
+        Uses the finest resolution that still holds the start of the range;
+        when that has too many points, the coarsest level with at least
+        max_points in range is reduced to max_points with LTTB. ``min`` and
+        ``max`` give the value envelope each returned point stands for.
+        """
+        candidates = []
+        for bucket, columns, complete in self._sources():
+            x = columns["x"]
+            covers = complete or (start is not None and len(x) > 0 and x[0] <= start)
+            lo = 0 if start is None else int(np.searchsorted(x, start, side="left"))
+            hi = len(x) if end is None else int(np.searchsorted(x, end, side="right"))
+            if start is not None and lo > 0 and bucket > 1:
+                lo -= 1  # Bucket starting before start that may contain it
+            selected = {name: values[lo:hi] for name, values in columns.items()}
+            candidates.append((bucket, selected, covers))
+            if covers and hi - lo <= max_points:
+                break
+
+        covering = [c for c in candidates if c[2]] or candidates[-1:]
+        # Coarsest covering level that still has at least max_points in range
+        bucket, columns, _ = next(
+            (c for c in reversed(covering) if len(c[1]["x"]) >= max_points), covering[0]
+        )
+        method = "raw" if bucket == 1 else "rollup"
+        if len(columns["x"]) > max_points:
+            columns, method = downsample(columns, max_points), "lttb"
+        return format_points(columns, bucket, method)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "raw": self.raw.state_dict(),
+            "rollups": [ring.state_dict() for ring in self.rollups],
+            "open": self._open
+        }
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        self.raw.load_state_dict(state["raw"])
+        for ring, ring_state in zip(self.rollups, state["rollups"]):
+            ring.load_state_dict(ring_state)
+        self._open = [list(bucket) if bucket else None for bucket in state["open"]]
+
+class MetricsStore:
+    """Named MetricSeries sharing one configuration"""
+
+    def __init__(self, names: Iterable[str], capacity: int = 4096, factor: int = 10, levels: int = 4):
+        self.series = {name: MetricSeries(capacity, factor, levels) for name in names}
+
+    def __getitem__(self, name: str) -> MetricSeries:
+        return self.series[name]
+
+    def append(self, name: str, x: int, y: float):
+        self.series[name].append(x, y)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {name: series.state_dict() for name, series in self.series.items()}
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        for name, series_state in state.items():
+            if name in self.series:
+                self.series[name].load_state_dict(series_state)
@@ -0,0 +1,206 @@
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+# Sortable columns exposed to queries
+SORT_FIELDS = ("name", "size", "created", "modified", "episode", "eval_score")
+
+EPISODE_PATTERN = re.compile(r"episode_(\d+)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    filename TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    created REAL NOT NULL,
+    modified REAL NOT NULL,
+    hash TEXT,
+    episode INTEGER,
+    config TEXT,
+    eval_score REAL
+);
+CREATE INDEX IF NOT EXISTS models_modified ON models (modified);
+CREATE INDEX IF NOT EXISTS models_episode ON models (episode);
+CREATE INDEX IF NOT EXISTS models_eval_score ON models (eval_score);
+"""
+
+def file_hash(filepath: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ModelRegistry:
+    """SQLite index of the saved checkpoints in ``models_dir``.
+
+    Models saved through ``register`` are recorded with their training
+    metadata (episode, config, eval score). Files added, replaced or removed
+    behind the registry's back are picked up by ``refresh``, which only
+    rescans the directory when its mtime changes or ``rescan_interval``
+    seconds have passed, and only re-hashes files whose size or mtime differ
+    from the index. Listing is then a single indexed query.
+    """
+
+    def __init__(self, models_dir: str = "models/saved", index_path: str = "models/registry.db",
+                 rescan_interval: float = 10.0):
+        self.models_dir = models_dir
+        self.index_path = index_path
+        self.rescan_interval = rescan_interval
+        self.lock = threading.Lock()
+        self._dir_mtime_ns = None
+        self._last_scan = 0.0
+
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(index_path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.db:
+            self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def register(self, filepath: str, episode: Optional[int] = None,
+                 config: Optional[Dict[str, Any]] = None,
+                 eval_score: Optional[float] = None) -> Dict[str, Any]:
+        """Index a freshly saved model file with its training metadata"""
+        filename = os.path.basename(filepath)
+        stat = os.stat(filepath)
+        if episode is None:
+            episode = self._episode_from_name(filename)
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (filename, os.path.splitext(filename)[0], stat.st_size, stat.st_mtime_ns,
+                 stat.st_ctime, stat.st_mtime, file_hash(filepath), episode,
+                 json.dumps(config, default=str) if config is not None else None, eval_score)
+            )
+        return self.get(filename)
+
+    def set_eval_score(self, filename: str, eval_score: float) -> bool:
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "UPDATE models SET eval_score = ? WHERE filename = ?", (eval_score, filename)
+            )
+        return cursor.rowcount > 0
+
+    def remove(self, filename: str):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM models WHERE filename = ?", (filename,))
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        self.refresh()
+        with self.lock:
+            row = self.db.execute("SELECT * FROM models WHERE filename = ?", (filename,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def query(self, sort: str = "modified", descending: bool = True, search: Optional[str] = None,
+              min_episode: Optional[int] = None, min_score: Optional[float] = None,
+              limit: Optional[int] = None, offset: int = 0) -> Dict[str, Any]:
+        """Sorted, filtered and paginated listing; returns the page and the filtered total"""
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        self.refresh()
+
+        clauses, params = [], []
+        if search:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        if min_episode is not None:
+            clauses.append("episode >= ?")
+            params.append(min_episode)
+        if min_score is not None:
+            clauses.append("eval_score >= ?")
+            params.append(min_score)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Rows without the sort value go last in either direction
+        order = f"ORDER BY {sort} IS NULL, {sort} {'DESC' if descending else 'ASC'}, filename"
+
+        with self.lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM models {where}", params).fetchone()[0]
+            rows = self.db.execute(
+                f"SELECT * FROM models {where} {order} LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, offset]
+            ).fetchall()
+        return {"models": [self._to_dict(row) for row in rows], "total": total}
+
+    def refresh(self, force: bool = False):
+        """Bring the index in line with the files on disk"""
+        try:
+            dir_mtime_ns = os.stat(self.models_dir).st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime_ns = None
+        now = time.monotonic()
+        if (not force and dir_mtime_ns == self._dir_mtime_ns
+                and now - self._last_scan < self.rescan_interval):
+            return
+
+        with self.lock:
+            indexed = {
+                row["filename"]: (row["size"], row["mtime_ns"])
+                for row in self.db.execute("SELECT filename, size, mtime_ns FROM models")
+            }
+            on_disk = {}
+            if dir_mtime_ns is not None:
+                with os.scandir(self.models_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".pth") and entry.is_file():
+                            on_disk[entry.name] = entry.stat()
+
+            with self.db:
+                removed = [(name,) for name in indexed if name not in on_disk]
+                self.db.executemany("DELETE FROM models WHERE filename = ?", removed)
+
+                for filename, stat in on_disk.items():
+                    if indexed.get(filename) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    filepath = os.path.join(self.models_dir, filename)
+                    try:
+                        digest = file_hash(filepath)
+                    except FileNotFoundError:
+                        continue
+                    if filename in indexed:
+                        # Contents changed: keep the metadata row, drop the stale score
+                        self.db.execute(
+                            "UPDATE models SET size = ?, mtime_ns = ?, modified = ?, hash = ?, "
+                            "eval_score = NULL WHERE filename = ?",
+                            (stat.st_size, stat.st_mtime_ns, stat.st_mtime, digest, filename)
+                        )
+                    else:
+                        self.db.execute(
+                            "INSERT INTO models (filename, name, size, mtime_ns, created, modified, "
+                            "hash, episode) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (filename, os.path.splitext(filename)[0], stat.st_size, stat.st_mtime_ns,
+                             stat.st_ctime, stat.st_mtime, digest, self._episode_from_name(filename))
+                        )
+
+            self._dir_mtime_ns = dir_mtime_ns
+            self._last_scan = now
+
+    def _episode_from_name(self, filename: str) -> Optional[int]:
+        match = EPISODE_PATTERN.search(filename)
+        return int(match.group(1)) if match else None
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "name": row["name"],
+            "filename": row["filename"],
+            "size": row["size"],
+            "created": datetime.fromtimestamp(row["created"]).isoformat(),
+            "modified": datetime.fromtimestamp(row["modified"]).isoformat(),
+            "hash": row["hash"],
+            "episode": row["episode"],
+            "config": json.loads(row["config"]) if row["config"] else None,
+            "eval_score": row["eval_score"]
+        }
@@ -0,0 +1,61 @@
+
+import numpy as np
+import torch
+
+class NumpyPolicy:
+    """NumPy forward pass of a DQNNetwork for low-latency action selection.
+
+    The fc1/fc2/fc3 weights are copied into contiguous, transposed float32
+    arrays, and activations go into buffers that are reused between calls,
+    so a single-state forward pass is three small matmuls with no PyTorch
+    dispatch. The copy goes stale as the network trains; call ``sync`` to
+    refresh it from the torch weights.
+    """
+
+    def __init__(self, network: torch.nn.Module):
+        self.layers = []
+        for layer in (network.fc1, network.fc2, network.fc3):
+            weight = np.ascontiguousarray(layer.weight.detach().cpu().numpy().T, dtype=np.float32)
+            bias = np.array(layer.bias.detach().cpu().numpy(), dtype=np.float32)
+            self.layers.append((weight, bias))
+        self.input_size = self.layers[0][0].shape[0]
+        self._buffers = []
+        self._capacity = 0
+        self.syncs = 0
+
+    def sync(self, network: torch.nn.Module):
+        """Copy the current torch weights in place"""
+        with torch.no_grad():
+            for (weight, bias), layer in zip(self.layers, (network.fc1, network.fc2, network.fc3)):
+                np.copyto(weight, layer.weight.detach().cpu().numpy().T)
+                np.copyto(bias, layer.bias.detach().cpu().numpy())
+        self.syncs += 1
+
+    def _reserve(self, n: int):
+        if n > self._capacity:
+            self._capacity = max(n, 2 * self._capacity)
+            self._buffers = [np.empty((self._capacity, weight.shape[1]), dtype=np.float32)
+                             for weight, _ in self.layers]
+
+    def forward(self, states: np.ndarray) -> np.ndarray:
+        """Q-values for a (n, input_size) batch; the result is a reused buffer"""
+        n = len(states)
+        self._reserve(n)
+        x = states
+        last = len(self.layers) - 1
+        for i, (weight, bias) in enumerate(self.layers):
+            out = self._buffers[i][:n]
+            np.matmul(x, weight, out=out)
+            out += bias
+            if i < last:
+                np.maximum(out, 0, out=out)
+            x = out
+        return x
+
+    def act(self, state) -> int:
+        states = np.asarray(state, dtype=np.float32).reshape(1, self.input_size)
+        return int(self.forward(states)[0].argmax())
+
+    def act_batch(self, states) -> np.ndarray:
+        states = np.asarray(states, dtype=np.float32).reshape(-1, self.input_size)
+        return self.forward(states).argmax(1)
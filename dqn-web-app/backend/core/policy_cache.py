@@ -0,0 +1,124 @@
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+import torch
+
+from .dqn_agent import DQNNetwork
+
+def tensor_bytes(value) -> int:
+    """Total size of the tensors nested in a checkpoint value"""
+    if isinstance(value, torch.Tensor):
+        return value.nelement() * value.element_size()
+    if isinstance(value, dict):
+        return sum(tensor_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(tensor_bytes(v) for v in value)
+    return 0
+
+def load_checkpoint(filepath: str) -> Dict[str, Any]:
+    """Weights-only CPU load; tensors are memory-mapped from the file and paged in on use"""
+    return torch.load(filepath, map_location="cpu", weights_only=True, mmap=True)
+
+def build_policy(state_dict: Dict[str, torch.Tensor]) -> DQNNetwork:
+    """Inference-only DQNNetwork with layer sizes taken from the state dict"""
+    hidden_size, input_size = state_dict["fc1.weight"].shape
+    output_size = state_dict["fc3.weight"].shape[0]
+    network = DQNNetwork(input_size, hidden_size, output_size)
+    network.load_state_dict(state_dict)
+    network.eval()
+    for parameter in network.parameters():
+        parameter.requires_grad_(False)
+    return network
+
+class PolicyCache:
+    """LRU cache of deserialized checkpoints and inference policies.
+
+    Entries are keyed by kind and resolved path and remember the file's
+    mtime and size; a lookup whose file has changed since it was cached
+    reloads it. The total size of cached tensors is kept under
+    ``max_bytes`` by evicting least recently used entries.
+
+    ``get_policy`` only keeps the online Q-network, built for inference;
+    ``get_checkpoint`` keeps the full checkpoint for restoring an agent.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_checkpoint(self, filepath: str) -> Dict[str, Any]:
+        """Full checkpoint dict (shared: copy before modifying)"""
+        return self._get("checkpoint", filepath, lambda checkpoint: checkpoint)
+
+    def get_policy(self, filepath: str) -> DQNNetwork:
+        """Frozen Q-network of a checkpoint, ready for inference"""
+        return self._get(
+            "policy", filepath, lambda checkpoint: build_policy(checkpoint["q_network_state_dict"])
+        )
+
+    def _get(self, kind: str, filepath: str, build):
+        path = os.path.realpath(filepath)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = (kind, path)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    return entry[1]
+                self.invalidations += 1
+                self._remove(key)
+            self.misses += 1
+
+            value = build(load_checkpoint(path))
+            size = tensor_bytes(value.state_dict() if isinstance(value, torch.nn.Module) else value)
+            if size <= self.max_bytes:
+                self.entries[key] = (signature, value, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    self._remove(next(iter(self.entries)))
+                    self.evictions += 1
+            return value
+
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def invalidate(self, filepath: str):
+        """Drop every cached entry of a file"""
+        path = os.path.realpath(filepath)
+        with self.lock:
+            for key in [key for key in self.entries if key[1] == path]:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
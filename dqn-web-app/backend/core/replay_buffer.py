@@ -0,0 +1,481 @@
+
+import os
+import numpy as np
+import torch
+
+# Transition arrays, one .npy file each in a saved buffer directory
+ARRAY_FIELDS = ("states", "actions", "rewards", "next_states", "dones")
+
+class ReplayBuffer:
+    """Experience replay stored in preallocated, contiguous NumPy arrays.
+
+    Transitions are written at a cursor that wraps around once the buffer is
+    full, so the oldest transition is overwritten first (same eviction order
+    as a ``deque(maxlen=capacity)``).
+    """
+
+    array_fields = ARRAY_FIELDS
+
+    def __init__(self, capacity: int, state_size: int, seed=None):
+        self.capacity = int(capacity)
+        self.state_size = int(state_size)
+        self.rng = np.random.default_rng(seed)
+        self._allocate()
+
+        self.position = 0
+        self.size = 0
+        self._batch = None
+
+    def _allocate(self):
+        self.states = np.zeros((self.capacity, self.state_size), dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, self.state_size), dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=np.bool_)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the transition arrays"""
+        return sum(getattr(self, name).nbytes for name in self.array_fields)
+
+    @property
+    def bytes_per_transition(self) -> float:
+        return self.nbytes / self.capacity
+
+    def add(self, state, action, reward, next_state, done, stream: int = 0):
+        """Store a single transition at the write cursor.
+
+        ``stream`` identifies the environment the transition came from; it
+        is only used by buffers that share observations between transitions.
+        """
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, streams=None):
+        """Store a batch of transitions with one vectorized write per array"""
+        n = len(actions)
+        if n == 0:
+            return
+
+        indices = (self.position + np.arange(n)) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones
+
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample_indices(self, batch_size: int, num_minibatches: int = 1) -> np.ndarray:
+        """Draw slot indices uniformly from the filled part of the buffer.
+
+        Returns ``num_minibatches * batch_size`` indices, minibatch after
+        minibatch; indices within a minibatch are distinct.
+        """
+        total = batch_size * num_minibatches
+        if total <= self.size:
+            return self.rng.choice(self.size, size=total, replace=False)
+        return np.concatenate([
+            self.rng.choice(self.size, size=batch_size, replace=False)
+            for _ in range(num_minibatches)
+        ])
+
+    def _batch_arrays(self, batch_size: int):
+        if self._batch is None or len(self._batch[1]) != batch_size:
+            self._batch = (
+                np.empty((batch_size, self.state_size), dtype=np.float32),
+                np.empty(batch_size, dtype=np.int64),
+                np.empty(batch_size, dtype=np.float32),
+                np.empty((batch_size, self.state_size), dtype=np.float32),
+                np.empty(batch_size, dtype=np.bool_),
+            )
+        return self._batch
+
+    def gather(self, indices: np.ndarray):
+        """Copy the given slots into reusable batch arrays and wrap them as tensors.
+
+        The returned tensors share memory with the batch arrays and are only
+        valid until the next call.
+        """
+        out = self._batch_arrays(len(indices))
+        for source, target in zip(
+            (self.states, self.actions, self.rewards, self.next_states, self.dones), out
+        ):
+            np.take(source, indices, axis=0, out=target)
+
+        return tuple(torch.from_numpy(array) for array in out)
+
+    def sample(self, batch_size: int):
+        """Sample a uniform minibatch as (states, actions, rewards, next_states, dones) tensors"""
+        return self.gather(self.sample_indices(batch_size))
+
+    def save(self, directory: str) -> dict:
+        """Write the transition arrays as .npy files; returns the cursor metadata"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.array_fields:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        return {"capacity": self.capacity, "position": self.position, "size": self.size}
+
+    def load(self, directory: str, meta: dict, mmap: bool = True):
+        """Restore a buffer written by ``save``.
+
+        With ``mmap`` the arrays are mapped copy-on-write: loading is
+        near-instant, pages are read on first access, and new transitions
+        never modify the files.
+        """
+        for name in self.array_fields:
+            array = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="c" if mmap else None)
+            setattr(self, name, array)
+        self.capacity = len(self.actions)
+        self.position = int(meta["position"])
+        self.size = int(meta["size"])
+        self._batch = None
+
+# next_slots codes for transitions whose next observation is not another slot
+TERMINAL = -1  # Episode ended; the next observation is never used
+SPARE_BASE = -2  # -2 - k: kept in spare_observations[k]
+
+class CompactReplayBuffer(ReplayBuffer):
+    """Replay buffer that stores every observation once.
+
+    Within an episode a transition's next state is the following
+    transition's state, so instead of a ``next_states`` array each slot
+    keeps the index of the slot holding its next observation. Only the
+    latest transition of each running episode (and any transition whose
+    successor never arrived) keeps its next observation in a small spare
+    table; for transitions that end an episode ``gather`` returns zeros,
+    which the ``~done`` mask removes from the TD target.
+
+    Transitions are linked per ``stream`` (the index of the environment
+    that produced them) and only when the new state equals the stored next
+    observation, so out-of-order or unrelated writes stay correct and just
+    use a spare entry. Observations are kept as float32 or float16 and
+    done flags are packed eight to a byte.
+    """
+
+    array_fields = ("observations", "actions", "rewards", "next_slots", "done_bits",
+                    "spare_observations", "stream_slots")
+
+    def __init__(self, capacity: int, state_size: int, obs_dtype="float32", seed=None):
+        self.obs_dtype = np.dtype(obs_dtype)
+        if self.obs_dtype not in (np.float16, np.float32):
+            raise ValueError(f"Unsupported observation dtype: {obs_dtype}")
+        super().__init__(capacity, state_size, seed=seed)
+
+    def _allocate(self):
+        self.observations = np.zeros((self.capacity, self.state_size), dtype=self.obs_dtype)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_slots = np.full(self.capacity, TERMINAL, dtype=np.int32)
+        self.done_bits = np.zeros((self.capacity + 7) // 8, dtype=np.uint8)
+        # Next observations that are not stored in another slot, and the
+        # most recent slot of each stream that has not finished its episode
+        self.spare_observations = np.zeros((8, self.state_size), dtype=self.obs_dtype)
+        self.stream_slots = np.full(1, -1, dtype=np.int64)
+        self._free_spares = list(range(len(self.spare_observations)))
+
+    def add(self, state, action, reward, next_state, done, stream: int = 0):
+        """Store one transition with scalar writes, linking it like add_batch"""
+        i = self.position
+        done = bool(done)
+        if self.size == self.capacity:
+            code = int(self.next_slots[i])
+            if code <= SPARE_BASE:
+                self._free_spares.append(SPARE_BASE - code)
+            self.stream_slots[self.stream_slots == i] = -1
+        self._ensure_streams(stream + 1)
+
+        self.observations[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        bit = 1 << (i & 7)
+        if done:
+            self.done_bits[i >> 3] |= bit
+        else:
+            self.done_bits[i >> 3] &= 0xFF ^ bit
+        self.next_slots[i] = TERMINAL
+
+        # Link the stream's pending slot if this state is its next observation
+        pending = int(self.stream_slots[stream])
+        if pending >= 0:
+            spare = SPARE_BASE - int(self.next_slots[pending])
+            if (self.spare_observations[spare] == self.observations[i]).all():
+                self.next_slots[pending] = i
+                self._free_spares.append(spare)
+
+        if done:
+            self.stream_slots[stream] = -1
+        else:
+            spare = int(self._take_spares(1)[0])
+            self.spare_observations[spare] = next_state
+            self.next_slots[i] = SPARE_BASE - spare
+            self.stream_slots[stream] = i
+
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, streams=None):
+        """Store a batch of transitions, linking each to its stream's previous one.
+
+        ``streams`` gives the producing environment of every row (default:
+        one environment per row); rows of the same stream must be in the
+        order they happened.
+        """
+        n = len(actions)
+        if n == 0:
+            return
+
+        indices = (self.position + np.arange(n)) % self.capacity
+        obs = np.asarray(states).astype(self.obs_dtype, copy=False).reshape(n, self.state_size)
+        next_obs = np.asarray(next_states).astype(self.obs_dtype, copy=False).reshape(n, self.state_size)
+        dones = np.asarray(dones, dtype=np.bool_)
+        streams = np.arange(n) if streams is None else np.broadcast_to(np.asarray(streams, dtype=np.int64), (n,))
+        self._evict(indices)
+        self._ensure_streams(int(streams.max()) + 1)
+
+        # Previous row of the same stream within this batch, if any
+        order = np.argsort(streams, kind="stable")
+        same = streams[order[1:]] == streams[order[:-1]]
+        previous = np.full(n, -1)
+        previous[order[1:][same]] = order[:-1][same]
+        last_rows = order[np.append(~same, True)]
+
+        # Link rows to an earlier row of this batch
+        rows = np.flatnonzero(previous >= 0)
+        rows = rows[~dones[previous[rows]] & (next_obs[previous[rows]] == obs[rows]).all(axis=1)]
+        linked = np.zeros(n, dtype=np.bool_)
+        linked[previous[rows]] = True
+
+        self.observations[indices] = obs
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self._set_dones(indices, dones)
+        self.next_slots[indices] = TERMINAL
+        self.next_slots[indices[previous[rows]]] = indices[rows]
+
+        # Link first rows of each stream to the stream's pending slot
+        first = np.flatnonzero(previous < 0)
+        pending = self.stream_slots[streams[first]]
+        first, pending = first[pending >= 0], pending[pending >= 0]
+        spares = SPARE_BASE - self.next_slots[pending]
+        match = (self.spare_observations[spares] == obs[first]).all(axis=1)
+        self.next_slots[pending[match]] = indices[first[match]]
+        self._free_spares.extend(spares[match].tolist())
+
+        # Rows still waiting for their successor keep the next observation aside
+        waiting = np.flatnonzero(~dones & ~linked)
+        spares = self._take_spares(len(waiting))
+        self.spare_observations[spares] = next_obs[waiting]
+        self.next_slots[indices[waiting]] = SPARE_BASE - spares
+
+        self.stream_slots[streams[last_rows]] = np.where(dones[last_rows], -1, indices[last_rows])
+
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def _evict(self, indices: np.ndarray):
+        """Release spare entries of slots about to be overwritten and forget them as pending"""
+        if self.size + len(indices) <= self.capacity:
+            return  # Only empty slots
+        codes = self.next_slots[indices]
+        self._free_spares.extend((SPARE_BASE - codes[codes <= SPARE_BASE]).tolist())
+        self.stream_slots[np.isin(self.stream_slots, indices)] = -1
+
+    def _ensure_streams(self, n_streams: int):
+        if n_streams > len(self.stream_slots):
+            grown = np.full(n_streams, -1, dtype=np.int64)
+            grown[:len(self.stream_slots)] = self.stream_slots
+            self.stream_slots = grown
+
+    def _take_spares(self, count: int) -> np.ndarray:
+        if count > len(self._free_spares):
+            current = len(self.spare_observations)
+            size = max(2 * current, current + count)
+            grown = np.zeros((size, self.state_size), dtype=self.obs_dtype)
+            grown[:current] = self.spare_observations
+            self.spare_observations = grown
+            self._free_spares.extend(range(current, size))
+        taken = self._free_spares[len(self._free_spares) - count:]
+        del self._free_spares[len(self._free_spares) - count:]
+        return np.array(taken, dtype=np.int64)
+
+    def _set_dones(self, indices: np.ndarray, dones: np.ndarray):
+        byte = indices >> 3
+        mask = (1 << (indices & 7)).astype(np.uint8)
+        np.bitwise_and.at(self.done_bits, byte, ~mask)
+        np.bitwise_or.at(self.done_bits, byte[dones], mask[dones])
+
+    def get_dones(self, indices: np.ndarray) -> np.ndarray:
+        return ((self.done_bits[indices >> 3] >> (indices & 7)) & 1).astype(np.bool_)
+
+    def gather(self, indices: np.ndarray):
+        out = self._batch_arrays(len(indices))
+        states, actions, rewards, next_states, dones = out
+        states[:] = self.observations[indices]
+        np.take(self.actions, indices, out=actions)
+        np.take(self.rewards, indices, out=rewards)
+        dones[:] = self.get_dones(indices)
+
+        codes = self.next_slots[indices]
+        next_states.fill(0)
+        linked = codes >= 0
+        next_states[linked] = self.observations[codes[linked]]
+        spare = codes <= SPARE_BASE
+        next_states[spare] = self.spare_observations[SPARE_BASE - codes[spare]]
+
+        return tuple(torch.from_numpy(array) for array in out)
+
+    def load(self, directory: str, meta: dict, mmap: bool = True):
+        super().load(directory, meta, mmap)
+        self.obs_dtype = self.observations.dtype
+        # Spare entries referenced by no slot are free
+        codes = self.next_slots[:self.size]
+        used = set((SPARE_BASE - codes[codes <= SPARE_BASE]).tolist())
+        self._free_spares = [k for k in range(len(self.spare_observations)) if k not in used]
+
+class SumTree:
+    """Binary segment tree of non-negative priorities stored in a flat array.
+
+    Leaves live at ``[leaf_offset, leaf_offset + capacity)`` and each internal
+    node ``i`` holds the sum of its children ``2i`` and ``2i + 1``; the root is
+    node 1. Updates and prefix-sum lookups are vectorized across a batch and
+    take one NumPy operation per tree level.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self.depth = max(1, int(np.ceil(np.log2(self.capacity))))
+        self.leaf_offset = 1 << self.depth
+        self.tree = np.zeros(2 * self.leaf_offset, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def __getitem__(self, indices):
+        return self.tree[self.leaf_offset + np.asarray(indices)]
+
+    def set(self, index: int, value: float):
+        """Set one leaf priority, walking its ancestors with scalar indexing"""
+        tree = self.tree
+        node = self.leaf_offset + int(index)
+        tree[node] = value
+        node >>= 1
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node >>= 1
+
+    def update(self, indices, values):
+        """Set leaf priorities of a batch and recompute the affected ancestors"""
+        nodes = self.leaf_offset + np.asarray(indices)
+        self.tree[nodes] = values
+
+        nodes = np.unique(nodes // 2)
+        for _ in range(self.depth):
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Return the leaf index whose prefix-sum interval contains each value"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sums = self.tree[left]
+            go_right = values > left_sums
+            values = np.where(go_right, values - left_sums, values)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self.leaf_offset
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Proportional prioritized experience replay (Schaul et al., 2016).
+
+    Slots are sampled with probability ``p_i^alpha / sum_k p_k^alpha`` using a
+    ``SumTree``. New transitions get the largest priority seen so far, and
+    ``importance_weights`` returns the bias-correcting weights
+    ``(N * P(i))^-beta`` normalised by the batch maximum, with beta annealed
+    towards 1 on every sampled batch.
+    """
+
+    def __init__(self, capacity: int, state_size: int, alpha: float = 0.6,
+                 beta: float = 0.4, beta_increment: float = 0.001,
+                 priority_eps: float = 1e-6, seed=None, **kwargs):
+        super().__init__(capacity, state_size, seed=seed, **kwargs)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.priority_eps = priority_eps
+        self.max_priority = 1.0
+        self.priorities = SumTree(self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self.priorities.tree.nbytes
+
+    def add(self, state, action, reward, next_state, done, stream: int = 0):
+        index = self.position
+        super().add(state, action, reward, next_state, done, stream)
+        self.priorities.set(index, self.max_priority ** self.alpha)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, streams=None):
+        indices = (self.position + np.arange(len(actions))) % self.capacity
+        super().add_batch(states, actions, rewards, next_states, dones, streams)
+        if len(indices):
+            self.priorities.update(indices, self.max_priority ** self.alpha)
+
+    def sample_indices(self, batch_size: int, num_minibatches: int = 1) -> np.ndarray:
+        """Draw slot indices proportionally to priority, one per equal-mass segment.
+
+        Each of the ``num_minibatches`` minibatches is stratified over the
+        whole priority mass; all of them are found in one tree descent.
+        """
+        segment = self.priorities.total / batch_size
+        offsets = self.rng.random((num_minibatches, batch_size))
+        targets = ((np.arange(batch_size) + offsets) * segment).ravel()
+        indices = self.priorities.find(targets)
+
+        self.beta = min(1.0, self.beta + self.beta_increment * num_minibatches)
+        # Guard against float round-off landing on an empty leaf
+        return np.minimum(indices, self.size - 1)
+
+    def importance_weights(self, indices: np.ndarray, num_minibatches: int = 1) -> torch.Tensor:
+        """Importance-sampling weights for the sampled slots, max-normalised to 1 per minibatch"""
+        probabilities = self.priorities[indices] / self.priorities.total
+        weights = ((self.size * probabilities) ** (-self.beta)).reshape(num_minibatches, -1)
+        weights /= weights.max(axis=1, keepdims=True)
+        return torch.from_numpy(weights.ravel().astype(np.float32))
+
+    def save(self, directory: str) -> dict:
+        meta = super().save(directory)
+        np.save(os.path.join(directory, "priorities.npy"), self.priorities.tree)
+        meta.update(beta=self.beta, max_priority=self.max_priority)
+        return meta
+
+    def load(self, directory: str, meta: dict, mmap: bool = True):
+        super().load(directory, meta, mmap)
+        self.priorities = SumTree(self.capacity)
+        self.priorities.tree = np.load(
+            os.path.join(directory, "priorities.npy"), mmap_mode="c" if mmap else None
+        )
+        self.beta = meta["beta"]
+        self.max_priority = meta["max_priority"]
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """Bulk-update priorities of sampled slots from their absolute TD errors"""
+        priorities = np.abs(td_errors) + self.priority_eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.priorities.update(indices, priorities ** self.alpha)
+
+class CompactPrioritizedReplayBuffer(PrioritizedReplayBuffer, CompactReplayBuffer):
+    """Prioritized sampling over compact transition storage"""
@@ -0,0 +1,309 @@
+
+import json
+import math
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+from .metrics_store import downsample, format_points
+
+# Per-episode series written for every run
+HISTORY_SERIES = ("episode_rewards", "losses", "epsilon")
+
+# One record per flushed chunk in <series>.idx; the chunk itself is stored
+# in <series>.col as `count` int64 episodes followed by `count` float64 values
+CHUNK_DTYPE = np.dtype([("offset", "<i8"), ("count", "<i8"), ("first", "<i8"), ("last", "<i8")])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started REAL NOT NULL,
+    updated REAL NOT NULL,
+    ended REAL,
+    episodes INTEGER NOT NULL DEFAULT 0,
+    last_episode INTEGER,
+    average_reward REAL,
+    best_reward REAL,
+    config TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+class _SeriesLog:
+    """Append-only chunk log of one series; points are buffered until flush"""
+
+    def __init__(self, directory: str, name: str):
+        self.data = open(os.path.join(directory, f"{name}.col"), "ab")
+        self.index = open(os.path.join(directory, f"{name}.idx"), "ab")
+        self.x: List[int] = []
+        self.y: List[float] = []
+
+    def flush(self):
+        if not self.x:
+            return
+        x = np.asarray(self.x, dtype="<i8")
+        y = np.asarray(self.y, dtype="<f8")
+        offset = self.data.tell()
+        self.data.write(x.tobytes())
+        self.data.write(y.tobytes())
+        self.data.flush()
+        # Index record last: readers never see a chunk before its data
+        record = np.array([(offset, len(x), x[0], x[-1])], dtype=CHUNK_DTYPE)
+        self.index.write(record.tobytes())
+        self.index.flush()
+        self.x.clear()
+        self.y.clear()
+
+    def close(self):
+        self.flush()
+        self.data.close()
+        self.index.close()
+
+class HistoryWriter:
+    """Writes one run's series; flushes every ``chunk_points`` points or ``flush_interval`` seconds"""
+
+    def __init__(self, history: "RunHistory", run_id: str, directory: str,
+                 series=HISTORY_SERIES, chunk_points: int = 1024, flush_interval: float = 5.0):
+        self.history = history
+        self.run_id = run_id
+        self.chunk_points = chunk_points
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.logs = {name: _SeriesLog(directory, name) for name in series}
+        self.episodes = 0
+        self.last_episode = None
+        self.best_reward = None
+        self._recent_rewards = deque(maxlen=100)
+        self._last_flush = time.monotonic()
+        self.closed = False
+
+    def append(self, episode: int, values: Dict[str, Optional[float]]):
+        """Record one episode's values; None values are skipped"""
+        with self.lock:
+            for name, value in values.items():
+                if value is not None and name in self.logs:
+                    self.logs[name].x.append(int(episode))
+                    self.logs[name].y.append(float(value))
+            self.episodes += 1
+            self.last_episode = int(episode)
+            reward = values.get("episode_rewards")
+            if reward is not None:
+                self._recent_rewards.append(float(reward))
+                self.best_reward = reward if self.best_reward is None else max(self.best_reward, reward)
+
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if due or any(len(log.x) >= self.chunk_points for log in self.logs.values()):
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        for log in self.logs.values():
+            log.flush()
+        self._last_flush = time.monotonic()
+        self.history._update_run(self.run_id, self._summary())
+
+    def _summary(self) -> Dict[str, Any]:
+        return {
+            "episodes": self.episodes,
+            "last_episode": self.last_episode,
+            "average_reward": float(np.mean(self._recent_rewards)) if self._recent_rewards else None,
+            "best_reward": self.best_reward
+        }
+
+    def close(self, status: str = "completed"):
+        with self.lock:
+            if self.closed:
+                return
+            for log in self.logs.values():
+                log.close()
+            self.closed = True
+            self.history._update_run(self.run_id, {**self._summary(), "status": status,
+                                                   "ended": time.time()})
+        self.history._writer_closed(self.run_id)
+
+class RunHistory:
+    """On-disk history of training runs.
+
+    Every run gets a directory of append-only column logs, one per series,
+    written in chunks by a ``HistoryWriter``, and a row in a small SQLite
+    index with its name, config, status and summary. Reads use the chunk
+    index to load only the chunks overlapping the requested episode range,
+    and large ranges are reduced chunk by chunk before downsampling, so
+    memory stays bounded by ``max_points`` rather than the run length.
+    """
+
+    def __init__(self, history_dir: str = "models/history", chunk_points: int = 1024,
+                 flush_interval: float = 5.0, mark_interrupted: bool = True):
+        self.history_dir = history_dir
+        self.chunk_points = chunk_points
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self._writers: Dict[str, HistoryWriter] = {}
+
+        os.makedirs(history_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(history_dir, "index.db"), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.db:
+            self.db.executescript(SCHEMA)
+            if mark_interrupted:
+                # Runs left "running" by a server that is no longer writing them
+                self.db.execute("UPDATE runs SET status = 'interrupted' WHERE status = 'running'")
+
+    def close(self):
+        for writer in list(self._writers.values()):
+            writer.close("interrupted")
+        with self.lock:
+            self.db.close()
+
+    def create_run(self, name: str, config: Optional[Dict[str, Any]] = None) -> HistoryWriter:
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        directory = os.path.join(self.history_dir, run_id)
+        os.makedirs(directory)
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT INTO runs (run_id, name, status, started, updated, config) "
+                "VALUES (?, ?, 'running', ?, ?, ?)",
+                (run_id, name, now, now, json.dumps(config, default=str) if config is not None else None)
+            )
+        writer = HistoryWriter(self, run_id, directory, chunk_points=self.chunk_points,
+                               flush_interval=self.flush_interval)
+        self._writers[run_id] = writer
+        return writer
+
+    def _update_run(self, run_id: str, fields: Dict[str, Any]):
+        fields = {**fields, "updated": time.time()}
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self.lock, self.db:
+            self.db.execute(f"UPDATE runs SET {assignments} WHERE run_id = ?",
+                            list(fields.values()) + [run_id])
+
+    def _writer_closed(self, run_id: str):
+        self._writers.pop(run_id, None)
+
+    def list_runs(self, limit: Optional[int] = None, offset: int = 0,
+                  status: Optional[str] = None) -> Dict[str, Any]:
+        """Runs newest first; returns the page and the total"""
+        where, params = ("WHERE status = ?", [status]) if status else ("", [])
+        with self.lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM runs {where}", params).fetchone()[0]
+            rows = self.db.execute(
+                f"SELECT * FROM runs {where} ORDER BY started DESC LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, offset]
+            ).fetchall()
+        return {"runs": [self._to_dict(row) for row in rows], "total": total}
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def delete_run(self, run_id: str) -> bool:
+        if run_id in self._writers:
+            raise ValueError("Run is still being written")
+        with self.lock, self.db:
+            cursor = self.db.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        shutil.rmtree(self._run_dir(run_id), ignore_errors=True)
+        return cursor.rowcount > 0
+
+    def _run_dir(self, run_id: str) -> str:
+        return os.path.join(self.history_dir, os.path.basename(run_id))
+
+    def _chunks(self, run_id: str, name: str) -> np.ndarray:
+        """Complete chunk records of a series (a torn trailing record is ignored)"""
+        path = os.path.join(self._run_dir(run_id), f"{name}.idx")
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=CHUNK_DTYPE)
+        with open(path, "rb") as f:
+            data = f.read()
+        usable = len(data) - len(data) % CHUNK_DTYPE.itemsize
+        return np.frombuffer(data[:usable], dtype=CHUNK_DTYPE)
+
+    def _locate(self, run_id: str, name: str):
+        """Chunk records and not yet flushed points, read consistently with a live writer"""
+        writer = self._writers.get(run_id)
+        if writer is None:
+            return self._chunks(run_id, name), np.zeros(0, dtype=np.int64), np.zeros(0)
+        with writer.lock:
+            log = writer.logs[name]
+            return (self._chunks(run_id, name), np.asarray(log.x, dtype=np.int64),
+                    np.asarray(log.y, dtype=np.float64))
+
+    def read_series(self, run_id: str, name: str, start: Optional[int] = None,
+                    end: Optional[int] = None, max_points: int = 500) -> Dict[str, Any]:
+        """Points of one series with start <= episode <= end, at most max_points of them"""
+        if name not in HISTORY_SERIES:
+            raise ValueError(f"Unknown series: {name}")
+        if self.get_run(run_id) is None:
+            raise FileNotFoundError(f"Run not found: {run_id}")
+
+        chunks, pending_x, pending_y = self._locate(run_id, name)
+        lo = -math.inf if start is None else start
+        hi = math.inf if end is None else end
+        chunks = chunks[(chunks["last"] >= lo) & (chunks["first"] <= hi)]
+        total = int(chunks["count"].sum()) + len(pending_x)
+
+        # Pre-reduce each chunk to buckets of `bucket` points when the range is
+        # much larger than the output, so at most ~4 * max_points are held
+        bucket = max(1, math.ceil(total / (4 * max_points)))
+        parts = []
+        if len(chunks):
+            with open(os.path.join(self._run_dir(run_id), f"{name}.col"), "rb") as f:
+                for chunk in chunks:
+                    f.seek(int(chunk["offset"]))
+                    count = int(chunk["count"])
+                    x = np.fromfile(f, dtype="<i8", count=count)
+                    y = np.fromfile(f, dtype="<f8", count=count)
+                    if len(y) < count:
+                        break  # Data not fully written
+                    parts.append(_reduce(x, y, lo, hi, bucket))
+        parts.append(_reduce(pending_x, pending_y, lo, hi, bucket))
+
+        columns = {key: np.concatenate([part[key] for part in parts]) for key in ("x", "mean", "min", "max")}
+        method = "raw" if bucket == 1 else "rollup"
+        if len(columns["x"]) > max_points:
+            columns, method = downsample(columns, max_points), "lttb"
+        return format_points(columns, bucket, method)
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "run_id": row["run_id"],
+            "name": row["name"],
+            "status": row["status"],
+            "started": datetime.fromtimestamp(row["started"]).isoformat(),
+            "updated": datetime.fromtimestamp(row["updated"]).isoformat(),
+            "ended": datetime.fromtimestamp(row["ended"]).isoformat() if row["ended"] else None,
+            "episodes": row["episodes"],
+            "last_episode": row["last_episode"],
+            "average_reward": row["average_reward"],
+            "best_reward": row["best_reward"],
+            "config": json.loads(row["config"]) if row["config"] else None
+        }
+
+def _reduce(x: np.ndarray, y: np.ndarray, lo: float, hi: float, bucket: int) -> Dict[str, np.ndarray]:
+    """Points in [lo, hi] as x/mean/min/max columns, aggregated bucket points at a time"""
+    keep = (x >= lo) & (x <= hi)
+    x, y = x[keep], y[keep]
+    if bucket == 1 or len(x) == 0:
+        return {"x": x, "mean": y, "min": y, "max": y}
+    starts = np.arange(0, len(x), bucket)
+    counts = np.diff(np.append(starts, len(x)))
+    return {
+        "x": x[starts],
+        "mean": np.add.reduceat(y, starts) / counts,
+        "min": np.minimum.reduceat(y, starts),
+        "max": np.maximum.reduceat(y, starts)
+    }
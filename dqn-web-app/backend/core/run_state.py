@@ -0,0 +1,85 @@
+
+import json
+import os
+import random
+import shutil
+from typing import Dict, Any, List
+
+import numpy as np
+import torch
+
+RUN_FILE = "run.json"
+AGENT_FILE = "agent.pth"
+REPLAY_DIR = "replay"
+
+def capture_rng_state(agent, env=None) -> Dict[str, Any]:
+    """RNG states that influence training: global, agent, replay and env generators.
+
+    Only plain containers and tensors, so the state loads with weights_only.
+    """
+    name, key, pos, has_gauss, cached_gaussian = np.random.get_state()
+    state = {
+        "python": random.getstate(),
+        "numpy": (name, torch.from_numpy(key.astype(np.int64)), pos, has_gauss, cached_gaussian),
+        "torch": torch.get_rng_state(),
+        "agent": agent.rng.bit_generator.state,
+        "memory": agent.memory.rng.bit_generator.state
+    }
+    if env is not None:
+        state["env"] = env.unwrapped.np_random.bit_generator.state
+    return state
+
+def restore_rng_state(state: Dict[str, Any], agent, env=None):
+    random.setstate(state["python"])
+    name, key, pos, has_gauss, cached_gaussian = state["numpy"]
+    np.random.set_state((name, key.numpy().astype(np.uint32), pos, has_gauss, cached_gaussian))
+    torch.set_rng_state(state["torch"])
+    agent.rng.bit_generator.state = state["agent"]
+    agent.memory.rng.bit_generator.state = state["memory"]
+    if env is not None and "env" in state:
+        env.unwrapped.np_random.bit_generator.state = state["env"]
+
+def write_run_dir(directory: str, write):
+    """Call write(tmp_dir) and move the result into place as directory.
+
+    The previous run directory is only removed after the new one is
+    complete, so a crash mid-save leaves the last good copy intact.
+    """
+    temp_dir = f"{directory}.tmp"
+    old_dir = f"{directory}.old"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    try:
+        write(temp_dir)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    if os.path.exists(directory):
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(directory, old_dir)
+    os.replace(temp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def read_run_info(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, RUN_FILE)) as f:
+        return json.load(f)
+
+def list_runs(runs_dir: str) -> List[Dict[str, Any]]:
+    """Summaries of the saved runs in runs_dir, newest first"""
+    runs = []
+    if not os.path.isdir(runs_dir):
+        return runs
+    for name in os.listdir(runs_dir):
+        path = os.path.join(runs_dir, name)
+        if name.endswith((".tmp", ".old")) or not os.path.exists(os.path.join(path, RUN_FILE)):
+            continue
+        info = read_run_info(path)
+        runs.append({
+            "name": name,
+            "episode": info["episode"],
+            "saved": info["saved"],
+            "replay_size": info["replay"]["size"],
+            "average_reward": info["training_stats"].get("average_reward")
+        })
+    return sorted(runs, key=lambda run: run["saved"], reverse=True)
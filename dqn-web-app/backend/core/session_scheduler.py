@@ -0,0 +1,248 @@
+
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Any, Optional, Callable, List
+
+from .training_manager import TrainingManager, apply_stats_delta
+from .run_history import RunHistory
+
+def _run_session(session_id: str, config: Dict[str, Any], events, stop_event, models_dir: str,
+                 history_dir: Optional[str] = None):
+    """Worker process entry point: train one session and report through the events queue"""
+    import torch
+
+    # One intra-op thread per worker so concurrent sessions don't oversubscribe cores
+    torch.set_num_threads(1)
+
+    try:
+        # The server process owns the history index; only add this run to it
+        run_history = RunHistory(history_dir, mark_interrupted=False) if history_dir else None
+        manager = TrainingManager(run_history=run_history)
+        manager.history_name = f"session_{session_id}"
+        manager.models_dir = models_dir
+        manager.checkpoint_prefix = f"session_{session_id}"
+        manager.initialize_agent(config)
+        manager.add_callback(
+            lambda stats: events.put((session_id, "training_update", stats))
+        )
+
+        manager.start_training(config.get("episodes", 500))
+        while manager.training_thread.is_alive():
+            if stop_event.wait(0.5):
+                manager.stop_training()
+        manager.training_thread.join()
+        if manager.training_error:
+            raise RuntimeError(manager.training_error)
+
+        filepath = os.path.join(models_dir, f"session_{session_id}.pth")
+        manager.agent.save_model(filepath)
+        events.put((session_id, "training_complete", {
+            "stats": manager.get_stats_snapshot()["stats"],
+            "model_path": filepath,
+            "stopped": stop_event.is_set()
+        }))
+    except Exception as e:
+        events.put((session_id, "error", {"message": str(e)}))
+
+class TrainingSession:
+    """Bookkeeping for one scheduled training job"""
+
+    def __init__(self, session_id: str, config: Dict[str, Any]):
+        self.session_id = session_id
+        self.config = config
+        self.status = "queued"
+        self.stats: Dict[str, Any] = {}
+        self.stats_seq = 0
+        self.error: Optional[str] = None
+        self.model_path: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.process = None
+        self.stop_event = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"seq": self.stats_seq, "stats": self.stats}
+
+    def to_dict(self, include_stats: bool = True) -> Dict[str, Any]:
+        data = {
+            "session_id": self.session_id,
+            "status": self.status,
+            "config": self.config,
+            "error": self.error,
+            "model_path": self.model_path,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished
+        }
+        if include_stats:
+            data["stats"] = self.stats
+        return data
+
+class SessionScheduler:
+    """Runs many training sessions, each in its own worker process.
+
+    At most ``max_concurrent`` sessions train at once; further submissions
+    wait in a FIFO queue. Worker processes report stats through a shared
+    multiprocessing queue that a monitor thread drains into the session
+    records and forwards to registered listeners as
+    ``listener(session_id, message)``.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, models_dir: str = "models/saved",
+                 history_dir: Optional[str] = None):
+        self.max_concurrent = max(1, max_concurrent or os.cpu_count() or 1)
+        self.models_dir = models_dir
+        self.history_dir = history_dir
+        self.sessions: Dict[str, TrainingSession] = {}
+        self.pending = deque()
+        self.listeners: List[Callable] = []
+        self.lock = threading.Lock()
+
+        self._ctx = mp.get_context("spawn")
+        self._events = None
+        self._monitor_thread = None
+        self._running = False
+
+    def start(self):
+        """Start the monitor thread (idempotent)"""
+        if self._running:
+            return
+        self._events = self._ctx.Queue()
+        self._running = True
+        self._monitor_thread = threading.Thread(target=self._monitor, daemon=True)
+        self._monitor_thread.start()
+
+    def shutdown(self):
+        """Stop every session and the monitor thread"""
+        with self.lock:
+            self.pending.clear()
+            running = [s for s in self.sessions.values() if s.status == "running"]
+        for session in running:
+            session.stop_event.set()
+        for session in running:
+            session.process.join(timeout=10)
+            if session.process.is_alive():
+                session.process.terminate()
+
+        self._running = False
+        if self._monitor_thread:
+            self._monitor_thread.join()
+
+    def add_listener(self, listener: Callable):
+        """Add listener(session_id, message) for session events"""
+        self.listeners.append(listener)
+
+    def submit(self, config: Dict[str, Any]) -> TrainingSession:
+        """Queue a training job and return its session"""
+        self.start()
+        session = TrainingSession(uuid.uuid4().hex[:12], dict(config))
+        with self.lock:
+            self.sessions[session.session_id] = session
+            self.pending.append(session.session_id)
+            self._dispatch()
+        return session
+
+    def stop(self, session_id: str) -> bool:
+        """Cancel a queued session or ask a running one to stop"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return False
+            if session.status == "queued":
+                self.pending.remove(session_id)
+                session.status = "cancelled"
+                session.finished = time.time()
+            elif session.status == "running":
+                session.stop_event.set()
+                session.status = "stopping"
+            else:
+                return False
+
+        self._notify(session_id, {"type": "session_status", "data": session.to_dict(False)})
+        return True
+
+    def get(self, session_id: str) -> Optional[TrainingSession]:
+        return self.sessions.get(session_id)
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        return [s.to_dict(include_stats=False) for s in self.sessions.values()]
+
+    @property
+    def running_count(self) -> int:
+        return sum(1 for s in self.sessions.values() if s.status in ("running", "stopping"))
+
+    def _dispatch(self):
+        """Start queued sessions while below the concurrency limit; caller holds the lock"""
+        while self.pending and self.running_count < self.max_concurrent:
+            session = self.sessions[self.pending.popleft()]
+            session.stop_event = self._ctx.Event()
+            session.process = self._ctx.Process(
+                target=_run_session,
+                args=(session.session_id, session.config, self._events,
+                      session.stop_event, self.models_dir, self.history_dir),
+                daemon=True
+            )
+            session.process.start()
+            session.status = "running"
+            session.started = time.time()
+
+    def _finish(self, session: TrainingSession, status: str):
+        session.status = status
+        session.finished = time.time()
+        if session.process:
+            session.process.join(timeout=5)
+        self._dispatch()
+
+    def _monitor(self):
+        """Drain worker events and detect workers that died without reporting"""
+        while self._running:
+            try:
+                session_id, kind, payload = self._events.get(timeout=0.5)
+            except queue.Empty:
+                self._reap_dead_workers()
+                continue
+
+            with self.lock:
+                session = self.sessions.get(session_id)
+                if session is None:
+                    continue
+                if kind == "training_update":
+                    apply_stats_delta(session.stats, payload)
+                    session.stats_seq = payload["seq"]
+                elif kind == "training_complete":
+                    session.stats = payload["stats"]
+                    session.model_path = payload["model_path"]
+                    self._finish(session, "stopped" if payload["stopped"] else "completed")
+                elif kind == "error":
+                    session.error = payload["message"]
+                    self._finish(session, "failed")
+
+            if kind == "training_update":
+                self._notify(session_id, {"type": "training_update", "data": payload})
+            else:
+                self._notify(session_id, {"type": "session_status", "data": session.to_dict(False)})
+
+    def _reap_dead_workers(self):
+        with self.lock:
+            dead = [s for s in self.sessions.values()
+                    if s.status in ("running", "stopping") and not s.process.is_alive()
+                    and self._events.empty()]
+            for session in dead:
+                session.error = f"Worker exited with code {session.process.exitcode}"
+                self._finish(session, "failed")
+
+        for session in dead:
+            self._notify(session.session_id, {"type": "session_status", "data": session.to_dict(False)})
+
+    def _notify(self, session_id: str, message: Dict[str, Any]):
+        for listener in self.listeners:
+            try:
+                listener(session_id, message)
+            except Exception as e:
+                print(f"Session listener error: {e}")
@@ -0,0 +1,275 @@
+
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Callable, List
+
+import numpy as np
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Stable hash of a trial configuration, used as the result cache key"""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def grid_configs(base: Dict[str, Any], parameters: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the parameter value lists applied over the base config"""
+    names = sorted(parameters)
+    configs = []
+    for values in itertools.product(*(parameters[name] for name in names)):
+        config = dict(base)
+        config.update(zip(names, values))
+        configs.append(config)
+    return configs
+
+def random_configs(base: Dict[str, Any], parameters: Dict[str, Any], n_trials: int,
+                   seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Random search over the parameter space.
+
+    A list value is sampled uniformly as a choice; a ``{"low", "high", "log"}``
+    dict is sampled uniformly (or log-uniformly) from the range, and stays an
+    integer when both bounds are integers.
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n_trials):
+        config = dict(base)
+        for name in sorted(parameters):
+            space = parameters[name]
+            if isinstance(space, dict):
+                low, high = space["low"], space["high"]
+                if space.get("log", False):
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                if isinstance(low, int) and isinstance(high, int):
+                    value = int(round(value))
+                config[name] = float(value) if isinstance(value, float) else value
+            else:
+                config[name] = space[int(rng.integers(len(space)))]
+        configs.append(config)
+    return configs
+
+def _run_trial(config: Dict[str, Any], solve_score: float) -> Dict[str, Any]:
+    """Worker process entry point: train one configuration and summarise it"""
+    import torch
+    from .training_manager import TrainingManager
+
+    torch.set_num_threads(1)
+    start = time.perf_counter()
+    solved = {"steps": None, "episode": None}
+
+    def track_solve(stats):
+        if (solved["steps"] is None and stats["episode"] >= 100
+                and stats["average_reward"] >= solve_score):
+            solved["steps"] = stats["total_steps"]
+            solved["episode"] = stats["episode"]
+
+    manager = TrainingManager()
+    # Trials only report results; don't write periodic checkpoints
+    manager.initialize_agent({**config, "checkpoint_interval": 0})
+    manager.add_callback(track_solve)
+    manager.start_training(config.get("episodes", 500))
+    manager.training_thread.join()
+    if manager.training_error:
+        raise RuntimeError(manager.training_error)
+
+    rewards = manager.metrics["episode_rewards"].tail(100)
+    return {
+        "final_reward": float(rewards[-1]) if len(rewards) else 0.0,
+        "average_reward": float(np.mean(rewards)) if len(rewards) else 0.0,
+        "steps_to_solve": solved["steps"],
+        "episodes_to_solve": solved["episode"],
+        "total_steps": manager.training_stats["total_steps"],
+        "wall_time": time.perf_counter() - start
+    }
+
+class Sweep:
+    """One submitted sweep: its trials and their results"""
+
+    def __init__(self, sweep_id: str, search: str, configs: List[Dict[str, Any]],
+                 varied: List[str], solve_score: float):
+        self.sweep_id = sweep_id
+        self.search = search
+        self.varied = varied
+        self.solve_score = solve_score
+        self.status = "running"
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.trials = [
+            {
+                "trial": i,
+                "config_hash": config_hash({**config, "solve_score": solve_score}),
+                "config": config,
+                "status": "pending",
+                "cached": False,
+                "result": None,
+                "error": None
+            }
+            for i, config in enumerate(configs)
+        ]
+        self.futures = []
+
+    def row(self, trial: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten a trial into one results-table row"""
+        row = {
+            "trial": trial["trial"],
+            "config_hash": trial["config_hash"],
+            "status": trial["status"],
+            "cached": trial["cached"],
+            "params": {name: trial["config"].get(name) for name in self.varied}
+        }
+        row.update(trial["result"] or {})
+        return row
+
+    def table(self) -> List[Dict[str, Any]]:
+        """Result rows of finished trials, best average reward first"""
+        rows = [self.row(t) for t in self.trials if t["status"] == "completed"]
+        return sorted(rows, key=lambda r: r["average_reward"], reverse=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        counts = {}
+        for trial in self.trials:
+            counts[trial["status"]] = counts.get(trial["status"], 0) + 1
+        return {
+            "sweep_id": self.sweep_id,
+            "search": self.search,
+            "status": self.status,
+            "varied": self.varied,
+            "solve_score": self.solve_score,
+            "trials": len(self.trials),
+            "counts": counts,
+            "created": self.created,
+            "finished": self.finished,
+            "table": self.table()
+        }
+
+class SweepRunner:
+    """Runs hyperparameter sweeps on a process pool with a config-hash result cache.
+
+    Completed trial results are appended to a JSON-lines cache file keyed by
+    ``config_hash``; re-submitting a sweep reuses any cached trial instead of
+    training it again. Each finished trial is forwarded to listeners as
+    ``listener(sweep_id, message)``.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, cache_path: str = "models/sweeps/trials.jsonl"):
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.cache_path = cache_path
+        self.sweeps: Dict[str, Sweep] = {}
+        self.listeners: List[Callable] = []
+        self.lock = threading.Lock()
+        self.cache = self._load_cache()
+        self._executor = None
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        cache = {}
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Ignore a torn final line
+                    cache[entry["config_hash"]] = entry["result"]
+        return cache
+
+    def _store_cache(self, key: str, result: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with open(self.cache_path, "a") as f:
+            f.write(json.dumps({"config_hash": key, "result": result}) + "\n")
+        self.cache[key] = result
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=mp.get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def add_listener(self, listener: Callable):
+        """Add listener(sweep_id, message) for trial results"""
+        self.listeners.append(listener)
+
+    def submit(self, configs: List[Dict[str, Any]], search: str, varied: List[str],
+               solve_score: float) -> Sweep:
+        """Start a sweep over the given trial configurations"""
+        sweep = Sweep(uuid.uuid4().hex[:12], search, configs, varied, solve_score)
+        with self.lock:
+            self.sweeps[sweep.sweep_id] = sweep
+
+        for trial in sweep.trials:
+            cached = self.cache.get(trial["config_hash"])
+            if cached is not None:
+                trial.update(status="completed", cached=True, result=cached)
+                self._notify(sweep, trial)
+                continue
+
+            trial["status"] = "running"
+            future = self.executor.submit(_run_trial, trial["config"], solve_score)
+            future.add_done_callback(
+                lambda f, trial=trial: self._trial_done(sweep, trial, f)
+            )
+            sweep.futures.append(future)
+
+        self._check_finished(sweep)
+        return sweep
+
+    def cancel(self, sweep_id: str) -> bool:
+        """Cancel trials of a sweep that have not started yet"""
+        sweep = self.sweeps.get(sweep_id)
+        if sweep is None or sweep.status != "running":
+            return False
+        for future in sweep.futures:
+            future.cancel()
+        return True
+
+    def get(self, sweep_id: str) -> Optional[Sweep]:
+        return self.sweeps.get(sweep_id)
+
+    def _trial_done(self, sweep: Sweep, trial: Dict[str, Any], future):
+        with self.lock:
+            if future.cancelled():
+                trial["status"] = "cancelled"
+            elif future.exception() is not None:
+                trial.update(status="failed", error=str(future.exception()))
+            else:
+                trial.update(status="completed", result=future.result())
+                self._store_cache(trial["config_hash"], trial["result"])
+
+        self._notify(sweep, trial)
+        self._check_finished(sweep)
+
+    def _check_finished(self, sweep: Sweep):
+        with self.lock:
+            if sweep.status != "running":
+                return
+            if any(t["status"] in ("pending", "running") for t in sweep.trials):
+                return
+            cancelled = any(t["status"] == "cancelled" for t in sweep.trials)
+            sweep.status = "cancelled" if cancelled else "completed"
+            sweep.finished = time.time()
+
+        self._emit(sweep.sweep_id, {"type": "sweep_complete", "data": sweep.to_dict()})
+
+    def _notify(self, sweep: Sweep, trial: Dict[str, Any]):
+        self._emit(sweep.sweep_id, {"type": "trial_result", "data": sweep.row(trial)})
+
+    def _emit(self, sweep_id: str, message: Dict[str, Any]):
+        for listener in self.listeners:
+            try:
+                listener(sweep_id, message)
+            except Exception as e:
+                print(f"Sweep listener error: {e}")
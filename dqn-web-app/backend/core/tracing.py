@@ -0,0 +1,156 @@
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+class Tracer:
+    """Opt-in timeline of spans, exported as Chrome/Perfetto trace-event JSON.
+
+    While ``enabled``, events go to a ring of the last ``capacity`` as
+    (phase, name, category, start, duration, thread id or track, args)
+    with ``time.perf_counter`` timestamps; phase is "X" for spans, "b" for
+    async spans that may overlap others and "i" for instants. A deque
+    append is atomic, so the training, writer and event-loop threads
+    record without a lock, and when disabled a call site costs one
+    attribute check. Load the export in chrome://tracing or ui.perfetto.dev
+    to see how the threads interleave.
+    """
+
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self.enabled = False
+        self.events = deque(maxlen=capacity)
+        self.recorded = 0
+        self.origin = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.stop_at: Optional[float] = None
+        self.thread_names: Dict[int, str] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def start(self, seconds: Optional[float] = None, capacity: Optional[int] = None):
+        """Clear the ring and record until stop(), or for the given number of seconds"""
+        with self._lock:
+            self._cancel_timer()
+            self.capacity = capacity or self.capacity
+            self.events = deque(maxlen=self.capacity)
+            self.recorded = 0
+            self.thread_names = {}
+            self.origin = self.started_at = time.perf_counter()
+            self.stopped_at = None
+            self.stop_at = self.started_at + seconds if seconds else None
+            if seconds:
+                self._timer = threading.Timer(seconds, self._expire, args=(self.started_at,))
+                self._timer.daemon = True
+                self._timer.start()
+            self.enabled = True
+
+    def stop(self):
+        """Stop recording; the ring keeps its events for export"""
+        with self._lock:
+            self._stop()
+
+    def _expire(self, started_at: float):
+        with self._lock:
+            # Ignore a timer that fired just as tracing was restarted
+            if self.started_at == started_at:
+                self._stop()
+
+    def _stop(self):
+        self._cancel_timer()
+        if self.enabled:
+            self.stopped_at = time.perf_counter()
+        self.enabled = False
+        self.stop_at = None
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+
+    def _record(self, phase: str, name: str, category: str, start: float, duration: float,
+                args: Optional[Dict[str, Any]]):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.events.append((phase, name, category, start, duration, tid, args))
+        self.recorded += 1
+
+    def complete(self, name: str, category: str, start: float, end: float,
+                 args: Optional[Dict[str, Any]] = None):
+        """Record a span that ran from start to end (perf_counter seconds)"""
+        self._record("X", name, category, start, end - start, args)
+
+    def complete_async(self, name: str, category: str, start: float, end: float, track: int,
+                       args: Optional[Dict[str, Any]] = None):
+        """Record a span shown on its own track, for spans that overlap on one thread"""
+        self.events.append(("b", name, category, start, end - start, track, args))
+        self.recorded += 1
+
+    def instant(self, name: str, category: str, args: Optional[Dict[str, Any]] = None):
+        """Record a point-in-time event"""
+        self._record("i", name, category, time.perf_counter(), 0.0, args)
+
+    @contextmanager
+    def span(self, name: str, category: str, /, **args):
+        """Record the enclosed block as a span if tracing is enabled when it starts.
+
+        name and category are positional-only so args may use any key.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, time.perf_counter(), args or None)
+
+    def export(self) -> Dict[str, Any]:
+        """The ring as a trace-event JSON object, timestamps in µs since start()"""
+        # deque.copy runs in C without releasing the GIL, so it is a
+        # consistent snapshot even while other threads keep appending
+        events = self.events.copy()
+        pid = os.getpid()
+        trace = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                  "args": {"name": "DQN backend"}}]
+        trace.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self.thread_names.items())
+        )
+        for phase, name, category, start, duration, tid, args in events:
+            ts = (start - self.origin) * 1e6
+            event = {"name": name, "cat": category, "ph": phase, "pid": pid, "tid": tid, "ts": ts}
+            if args:
+                event["args"] = args
+            if phase == "X":
+                event["dur"] = duration * 1e6
+            elif phase == "b":
+                event.update(tid=0, id=tid)
+                trace.append(event)
+                event = {"name": name, "cat": category, "ph": "e", "pid": pid, "tid": 0,
+                         "id": tid, "ts": ts + duration * 1e6}
+            else:
+                event["s"] = "t"  # Thread-scoped instant
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms", "otherData": self.get_stats()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.perf_counter()
+        return {
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "events": len(self.events),
+            "recorded": self.recorded,
+            "overwritten": max(0, self.recorded - len(self.events)),
+            "elapsed": ((self.stopped_at or now) - self.started_at
+                        if self.started_at is not None else None),
+            "remaining": max(0.0, self.stop_at - now) if self.stop_at is not None else None
+        }
+
+# Process-wide tracer; spans are recorded only while tracing is started
+tracer = Tracer()
@@ -1,19 +1,137 @@
 
 import gymnasium as gym
 import numpy as np
+import torch
 import asyncio
+import json
+import os
 import threading
 import time
 from typing import Dict, Any, Optional, Callable
 from .dqn_agent import DQNAgent
+from .replay_buffer import CompactReplayBuffer
+from .evaluation import evaluate_policy, make_vector_env
+from .distributed import ActorPool
+from .checkpoint_writer import CheckpointWriter
+from .metrics_store import MetricsStore
+from .instrumentation import instrumentation
+from .tracing import tracer
+from .run_state import (
+    RUN_FILE, AGENT_FILE, REPLAY_DIR, capture_rng_state, restore_rng_state,
+    write_run_dir, read_run_info
+)
+from .video_encoder import VideoEncoder
 import cv2
 
+# Stats fields that grow by one point per episode; updates only carry new points
+SERIES_FIELDS = ("episode_rewards", "losses")
+# Most recent points of each series included in snapshots; older history
+# is available downsampled through MetricsStore queries
+SNAPSHOT_POINTS = 1000
+
+def apply_stats_delta(stats: Dict[str, Any], delta: Dict[str, Any],
+                      window: int = SNAPSHOT_POINTS) -> Dict[str, Any]:
+    """Fold a stats delta produced by TrainingManager into an accumulated stats dict.
+
+    Series keep their last ``window`` points; ``<series>_offset`` holds the
+    index of the first point kept.
+    """
+    for key, value in delta.items():
+        if key in SERIES_FIELDS:
+            series = stats.setdefault(key, [])
+            start = stats.get(f"{key}_offset", 0)
+            offset = delta[f"{key}_offset"]
+            if offset > start + len(series):
+                # Points were missed; continue from the delta
+                series[:] = value
+                start = offset
+            else:
+                # Points before start + len(series) were already received
+                series.extend(value[start + len(series) - offset:])
+            if len(series) > window:
+                start += len(series) - window
+                del series[:len(series) - window]
+            stats[f"{key}_offset"] = start
+        elif key not in ("seq", "base_seq") and not key.endswith("_offset"):
+            stats[key] = value
+    return stats
+
+def merge_stats_deltas(first: Dict[str, Any], second: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Combine two deltas into one spanning base_seq of the first to seq of the second.
+
+    Returns None when points are missing between them.
+    """
+    merged = dict(second)
+    merged["base_seq"] = first["base_seq"]
+    for key in SERIES_FIELDS:
+        first_end = first[f"{key}_offset"] + len(first[key])
+        if second[f"{key}_offset"] > first_end:
+            return None
+        merged[key] = first[key] + second[key][first_end - second[f"{key}_offset"]:]
+        merged[f"{key}_offset"] = first[f"{key}_offset"]
+    return merged
+
+# Training-loop phase timers and throughput counters, exported at /metrics
+_ACT_SECONDS = instrumentation.phase("act")
+_ENV_STEP_SECONDS = instrumentation.phase("env_step")
+_REMEMBER_SECONDS = instrumentation.phase("remember")
+_LEARN_SECONDS = instrumentation.phase("learn")
+_NOTIFY_SECONDS = instrumentation.phase("notify")
+_CHECKPOINT_SECONDS = instrumentation.phase("checkpoint")
+_SLEEP_SECONDS = instrumentation.phase("sleep")
+_ENV_STEPS = instrumentation.counter("env_steps_total", "Environment steps taken by training")
+_GRAD_STEPS = instrumentation.counter("grad_steps_total", "Gradient steps taken by training")
+_EPISODES = instrumentation.counter("episodes_total", "Training episodes finished")
+
 class TrainingManager:
-    def __init__(self):
+    def __init__(self, policy_cache=None, model_registry=None, run_history=None):
         self.agent = None
+        self.policy_cache = policy_cache
+        self.model_registry = model_registry
+        # On-disk per-episode history of every training run, under history_name
+        self.run_history = run_history
+        self.history_name = "training"
+        self.history_writer = None
         self.env = None
         self.is_training = False
         self.training_thread = None
+        # Message of the exception that ended the last run, if it failed
+        self.training_error: Optional[str] = None
+        self.config: Dict[str, Any] = {}
+        self.num_envs = 1
+        self.vector_mode = "sync"
+        self.distributed = False
+        self.num_actors = 2
+        self.weight_sync_interval = 50
+        self.actor_pool = None
+        # Learner schedule: gradient steps per episode or per env step,
+        # grouped num_minibatches at a time, after learning_starts transitions
+        self.update_mode = "episode"
+        self.updates_per_episode = 1
+        self.updates_per_step = 0.25
+        self.num_minibatches = 1
+        self.learning_starts = 0
+        self._update_credit = 0.0
+        self._pending_losses = []
+        self._train_start = None
+        self._train_end = None
+        self._learn_seconds = 0.0
+        # Steps of the current run, for the /metrics throughput gauges
+        self._env_steps = 0
+        self._run_grad_steps = 0
+        # Periodic background checkpoints with keep-last/keep-best retention
+        self.models_dir = "models/saved"
+        self.checkpoint_prefix = "checkpoint"
+        self.checkpoint_interval = 0
+        self.checkpoint_keep_last = 3
+        self.checkpoint_keep_best = 2
+        self.checkpoint_writer = None
+        # Resumable run state: full saves requested while training are
+        # performed by the training thread at the next episode boundary
+        self.runs_dir = "models/runs"
+        self._save_requests = []
+        self._resume_episode = 0
+        self._start_episode = 0
         self.training_stats = {
             "episode": 0,
             "total_episodes": 0,
@@ -21,15 +139,43 @@ class TrainingManager:
             "average_reward": 0,
             "epsilon": 1.0,
             "loss": 0,
-            "episode_rewards": [],
-            "losses": []
+            "total_steps": 0,
+            "grad_steps": 0,
+            "grad_steps_per_sec": 0,
+            "samples_per_sec": 0
         }
+        # Per-episode series in fixed memory: recent points at full
+        # resolution plus min/max/mean rollups of the whole run
+        self.metrics = MetricsStore(SERIES_FIELDS)
         self.callbacks = []
+        # Delta stream state: sequence number and how many points of each
+        # series have already been sent to callbacks
+        self.stats_lock = threading.Lock()
+        self.stats_seq = 0
+        self._sent_points = {field: 0 for field in SERIES_FIELDS}
 
     def initialize_agent(self, config: Dict[str, Any]):
         """Initialize DQN agent with given configuration"""
         self.env = gym.make("CartPole-v1", render_mode="rgb_array")
         state, _ = self.env.reset()
+        self.config = dict(config)
+
+        self.num_envs = max(1, int(config.get("num_envs", 1)))
+        self.vector_mode = config.get("vector_mode", "sync")
+        if self.vector_mode not in ("sync", "async"):
+            raise ValueError(f"Unknown vector_mode: {self.vector_mode}")
+        self.distributed = bool(config.get("distributed", False))
+        self.num_actors = max(1, int(config.get("num_actors", 2)))
+        self.weight_sync_interval = max(1, int(config.get("weight_sync_interval", 50)))
+        self.update_mode = config.get("update_mode", "episode")
+        if self.update_mode not in ("episode", "step"):
+            raise ValueError(f"Unknown update_mode: {self.update_mode}")
+        self.updates_per_episode = max(0, int(config.get("updates_per_episode", 1)))
+        self.updates_per_step = max(0.0, float(config.get("updates_per_step", 0.25)))
+        self.num_minibatches = max(1, int(config.get("num_minibatches", 1)))
+        self.checkpoint_interval = max(0, int(config.get("checkpoint_interval", 0)))
+        self.checkpoint_keep_last = max(0, int(config.get("checkpoint_keep_last", 3)))
+        self.checkpoint_keep_best = max(0, int(config.get("checkpoint_keep_best", 2)))
 
         self.agent = DQNAgent(
             state_size=len(state),
@@ -40,20 +186,89 @@ class TrainingManager:
             epsilon_min=config.get("epsilon_min", 0.01),
             epsilon_decay=config.get("epsilon_decay", 0.995),
             memory_size=config.get("memory_size", 10000),
-            batch_size=config.get("batch_size", 32)
+            batch_size=config.get("batch_size", 32),
+            prioritized_replay=config.get("prioritized_replay", False),
+            per_alpha=config.get("per_alpha", 0.6),
+            per_beta=config.get("per_beta", 0.4),
+            inference_backend=config.get("inference_backend", "torch"),
+            inference_sync_interval=config.get("inference_sync_interval", 1),
+            compact_replay=config.get("compact_replay", False),
+            replay_obs_dtype=config.get("replay_obs_dtype", "float32")
         )
+        self.learning_starts = max(self.agent.batch_size, int(config.get("learning_starts", 0)))
 
     def add_callback(self, callback: Callable):
         """Add callback function for training updates"""
         self.callbacks.append(callback)
 
+    def _stats_delta(self) -> Dict[str, Any]:
+        """Scalar stats plus the series points added since the previous delta"""
+        with self.stats_lock:
+            self.stats_seq += 1
+            delta = {"seq": self.stats_seq, "base_seq": self.stats_seq - 1}
+            delta.update(self.training_stats)
+            for key in SERIES_FIELDS:
+                values, offset = self.metrics[key].since(self._sent_points[key])
+                delta[key] = values
+                delta[f"{key}_offset"] = offset
+                self._sent_points[key] = len(self.metrics[key])
+        return delta
+
+    def _stats_with_series(self, points: int) -> Dict[str, Any]:
+        """Scalar stats plus the last points of each series and their start offsets"""
+        stats = dict(self.training_stats)
+        for key in SERIES_FIELDS:
+            values, offset = self.metrics[key].since(len(self.metrics[key]) - points)
+            stats[key] = values
+            stats[f"{key}_offset"] = offset
+        return stats
+
+    def get_stats_snapshot(self) -> Dict[str, Any]:
+        """Stats with the recent series points and the sequence number of the last delta they include"""
+        with self.stats_lock:
+            return {"seq": self.stats_seq, "stats": self._stats_with_series(SNAPSHOT_POINTS)}
+
+    def query_metrics(self, name: str, start: Optional[int] = None, end: Optional[int] = None,
+                      max_points: int = 500) -> Dict[str, Any]:
+        """Downsampled points of one series for episodes start..end"""
+        with self.stats_lock:
+            return self.metrics[name].query(start, end, max_points)
+
     def notify_callbacks(self):
-        """Notify all callbacks with current training stats"""
+        """Notify all callbacks with a sequence-numbered stats delta"""
+        start = time.perf_counter()
+        delta = self._stats_delta()
         for callback in self.callbacks:
             try:
-                callback(self.training_stats.copy())
+                callback(delta)
             except Exception as e:
                 print(f"Callback error: {e}")
+        _NOTIFY_SECONDS.record(start, time.perf_counter())
+
+    def _run_rate(self, count: int) -> Optional[float]:
+        """count per second of wall-clock time of the current (or last) run"""
+        if self._train_start is None:
+            return None
+        elapsed = (self._train_end or time.perf_counter()) - self._train_start
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def register_metrics(self, registry):
+        """Expose run state, throughput and replay occupancy as gauges of registry"""
+        def memory():
+            return self.agent.memory if self.agent else None
+
+        registry.gauge("training_active", "1 while a training run is in progress",
+                       lambda: float(self.is_training))
+        registry.gauge("env_steps_per_second", "Environment steps per second over the current run",
+                       lambda: self._run_rate(self._env_steps))
+        registry.gauge("grad_steps_per_second", "Gradient steps per second over the current run",
+                       lambda: self._run_rate(self._run_grad_steps))
+        registry.gauge("replay_size", "Transitions in replay memory",
+                       lambda: len(memory()) if memory() else None)
+        registry.gauge("replay_capacity", "Replay memory capacity in transitions",
+                       lambda: memory().capacity if memory() else None)
+        registry.gauge("replay_bytes", "Bytes allocated for replay memory",
+                       lambda: memory().nbytes if memory() else None)
 
     def start_training(self, episodes: int):
         """Start training in a separate thread"""
@@ -61,7 +276,26 @@ class TrainingManager:
             return False
 
         self.is_training = True
+        self.training_error = None
         self.training_stats["total_episodes"] = episodes
+        self._train_start = time.perf_counter()
+        self._train_end = None
+        self._learn_seconds = 0.0
+        self._env_steps = 0
+        self._run_grad_steps = 0
+        self._update_credit = 0.0
+        self._start_episode = self._resume_episode
+        self._resume_episode = 0
+        if self.checkpoint_interval:
+            self.checkpoint_writer = CheckpointWriter(
+                self.models_dir, prefix=self.checkpoint_prefix,
+                keep_last=self.checkpoint_keep_last, keep_best=self.checkpoint_keep_best,
+                on_written=self._checkpoint_written, on_removed=self._checkpoint_removed
+            )
+        if self.run_history is not None:
+            self.history_writer = self.run_history.create_run(
+                self.history_name, {**self.config, "episodes": episodes}
+            )
         self.training_thread = threading.Thread(
             target=self._training_loop, 
             args=(episodes,)
@@ -75,22 +309,59 @@ class TrainingManager:
         if self.training_thread:
             self.training_thread.join()
 
+    def _make_vector_env(self):
+        """Create the vectorized training environments"""
+        return make_vector_env("CartPole-v1", self.num_envs, self.vector_mode)
+
     def _training_loop(self, episodes: int):
         """Main training loop"""
-        for episode in range(episodes):
+        status = "failed"
+        try:
+            if self.distributed:
+                self._distributed_training_loop(episodes)
+            elif self.num_envs > 1:
+                self._vector_training_loop(episodes)
+            else:
+                self._single_env_training_loop(episodes)
+            status = "completed" if self.training_stats["episode"] >= episodes else "stopped"
+        except Exception as e:
+            self.training_error = str(e) or type(e).__name__
+            raise
+        finally:
+            if self.checkpoint_writer:
+                # Let queued checkpoints finish writing
+                self.checkpoint_writer.close()
+            if self.history_writer:
+                self.history_writer.close(status)
+                self.history_writer = None
+            self._process_save_requests()
+            self._train_end = time.perf_counter()
+            self.is_training = False
+
+    def _single_env_training_loop(self, episodes: int):
+        """Training loop on the manager's own environment"""
+        for episode in range(self._start_episode, episodes):
             if not self.is_training:
                 break
 
             state, _ = self.env.reset()
             total_reward = 0
             step = 0
+            started = time.perf_counter()
 
             while True:
+                t0 = time.perf_counter()
                 action = self.agent.act(state)
+                t1 = time.perf_counter()
                 next_state, reward, terminated, truncated, _ = self.env.step(action)
+                t2 = time.perf_counter()
                 done = terminated or truncated
 
                 self.agent.remember(state, action, reward, next_state, done)
+                _ACT_SECONDS.record(t0, t1)
+                _ENV_STEP_SECONDS.record(t1, t2)
+                _REMEMBER_SECONDS.record(t2, time.perf_counter())
+                self._after_env_steps(1)
                 state = next_state
                 total_reward += reward
                 step += 1
@@ -98,82 +369,451 @@ class TrainingManager:
                 if done:
                     break
 
-            # Train the agent
-            loss = self.agent.replay()
+            self._finish_episode(episode, total_reward, step, started=started)
+
+            # Small delay to prevent overwhelming the system
+            start = time.perf_counter()
+            time.sleep(0.01)
+            _SLEEP_SECONDS.record(start, time.perf_counter())
+
+    def _vector_training_loop(self, episodes: int):
+        """Training loop stepping num_envs environments in lockstep"""
+        envs = self._make_vector_env()
+        try:
+            # Seed from the agent's generator so a resumed run replays identically
+            states, _ = envs.reset(seed=int(self.agent.rng.integers(2 ** 31)))
+            returns = np.zeros(self.num_envs)
+            lengths = np.zeros(self.num_envs, dtype=np.int64)
+            # Envs that finished on the previous step; their next step only
+            # performs the reset, so that transition is not recorded.
+            autoreset = np.zeros(self.num_envs, dtype=bool)
+            started = np.full(self.num_envs, time.perf_counter())
+            episode = self._start_episode
+
+            while self.is_training and episode < episodes:
+                t0 = time.perf_counter()
+                actions = self.agent.act_batch(states)
+                t1 = time.perf_counter()
+                next_states, rewards, terminated, truncated, _ = envs.step(actions)
+                t2 = time.perf_counter()
+                dones = terminated | truncated
+                valid = ~autoreset
+
+                self.agent.remember_batch(
+                    states[valid], actions[valid], rewards[valid],
+                    next_states[valid], dones[valid], streams=np.flatnonzero(valid)
+                )
+                _ACT_SECONDS.record(t0, t1)
+                _ENV_STEP_SECONDS.record(t1, t2)
+                _REMEMBER_SECONDS.record(t2, time.perf_counter())
+                self._after_env_steps(int(valid.sum()))
+                returns[valid] += rewards[valid]
+                lengths[valid] += 1
+
+                for env_index in np.flatnonzero(dones & valid):
+                    if episode >= episodes:
+                        break
+                    self._finish_episode(episode, float(returns[env_index]), int(lengths[env_index]),
+                                         started=started[env_index], track=int(env_index))
+                    started[env_index] = time.perf_counter()
+                    returns[env_index] = 0
+                    lengths[env_index] = 0
+                    episode += 1
+
+                autoreset = dones
+                states = next_states
+        finally:
+            envs.close()
+
+    def _distributed_training_loop(self, episodes: int):
+        """Learner loop fed by actor processes.
+
+        Actors roll out episodes with the most recently broadcast weights
+        and stream transitions through shared memory; this thread copies
+        them into replay and runs num_minibatches gradient steps per
+        received chunk, publishing new weights every weight_sync_interval
+        steps. Epsilon decays once per finished actor episode, as in the
+        single-process loops.
+        """
+        self.actor_pool = ActorPool(
+            self.agent.q_network, self.agent.state_size, num_actors=self.num_actors
+        )
+        self.actor_pool.start(self.agent.q_network, self.agent.epsilon)
+        episode = self._start_episode
+        published_at = self.agent.grad_steps
+        try:
+            while self.is_training and episode < episodes:
+                # Take one chunk per learner update once replay is warm;
+                # actors block on free slots when they get ahead of the learner
+                warm = len(self.agent.memory) >= self.learning_starts
+                start = time.perf_counter()
+                received = self.actor_pool.drain_transitions(
+                    self.agent.remember_batch, max_chunks=1 if warm else None
+                )
+                if received:
+                    _REMEMBER_SECONDS.record(start, time.perf_counter())
+                    # Actors step the environments; count them as they arrive
+                    self._env_steps += received
+                    _ENV_STEPS.inc(received)
+                for _, total_reward, steps in self.actor_pool.drain_episodes():
+                    if episode >= episodes:
+                        break
+                    self._finish_episode(episode, total_reward, steps, learn=False)
+                    episode += 1
+
+                if not self._learn(self.num_minibatches):
+                    if not self.actor_pool.alive():
+                        raise RuntimeError("All actor processes exited")
+                    if not received:
+                        start = time.perf_counter()
+                        time.sleep(0.005)  # Waiting for the first batch of transitions
+                        _SLEEP_SECONDS.record(start, time.perf_counter())
+                    continue
+
+                if self.agent.grad_steps - published_at >= self.weight_sync_interval:
+                    self.actor_pool.weights.publish(self.agent.q_network, self.agent.epsilon)
+                    published_at = self.agent.grad_steps
+        finally:
+            self.actor_pool.stop()
+
+    def _learn(self, grad_steps: int) -> bool:
+        """Run grad_steps gradient steps, num_minibatches per replay sample.
+
+        Returns False if replay holds fewer than learning_starts transitions.
+        """
+        if grad_steps <= 0 or len(self.agent.memory) < self.learning_starts:
+            return False
+
+        start = time.perf_counter()
+        grad_steps_before = self.agent.grad_steps
+        while grad_steps > 0:
+            k = min(self.num_minibatches, grad_steps)
+            self._pending_losses.append(self.agent.replay(decay_epsilon=False, num_minibatches=k))
+            grad_steps -= k
+        end = time.perf_counter()
+        self._learn_seconds += end - start
+        _LEARN_SECONDS.record(start, end)
+        taken = self.agent.grad_steps - grad_steps_before
+        self._run_grad_steps += taken
+        _GRAD_STEPS.inc(taken)
+        return True
+
+    def _after_env_steps(self, n: int):
+        """Count env steps; in step mode, earn updates_per_step gradient steps per env step"""
+        self._env_steps += n
+        _ENV_STEPS.inc(n)
+        if self.update_mode != "step":
+            return
+        if len(self.agent.memory) < self.learning_starts:
+            self._update_credit = 0.0
+            return
+        self._update_credit += n * self.updates_per_step
+        # Run whole groups of num_minibatches so each replay sample is full size
+        grad_steps = int(self._update_credit // self.num_minibatches) * self.num_minibatches
+        if grad_steps:
+            self._update_credit -= grad_steps
+            self._learn(grad_steps)
+
+    def _finish_episode(self, episode: int, total_reward: float, steps: int, learn: bool = True,
+                        started: Optional[float] = None, track: int = 0):
+        """Learn from replay, update statistics and notify callbacks.
+
+        started is when the episode's first step began; with tracing on,
+        the episode is recorded as a span on the given track (one per env).
+        """
+        # Train the agent
+        if learn and self.update_mode == "episode":
+            self._learn(self.updates_per_episode)
+        if len(self.agent.memory) >= self.learning_starts:
+            self.agent.decay_epsilon()
+
+        # Mean loss of the updates since the previous episode ended
+        loss = float(np.mean(self._pending_losses)) if self._pending_losses else None
+        self._pending_losses.clear()
+
+        # Update target network every 100 episodes
+        if episode % 100 == 0:
+            self.agent.update_target_network()
+
+        self._record_episode(episode, total_reward, steps, loss)
+
+        # Snapshot weights in memory; the writer thread does the disk I/O
+        if self.checkpoint_writer and (episode + 1) % self.checkpoint_interval == 0:
+            start = time.perf_counter()
+            self.checkpoint_writer.submit(
+                self.agent.checkpoint_state(), episode + 1,
+                score=self.training_stats["average_reward"]
+            )
+            _CHECKPOINT_SECONDS.record(start, time.perf_counter())
+
+        self._process_save_requests()
+
+        if tracer.enabled:
+            args = {"episode": episode + 1, "reward": total_reward, "steps": steps}
+            if started is None:
+                # Distributed episodes ran in actor processes
+                tracer.instant("episode", "episode", args)
+            else:
+                tracer.complete_async("episode", "episode", float(started), time.perf_counter(),
+                                      track, args)
+
+    def save_run(self, name: str, timeout: float = 120.0) -> Dict[str, Any]:
+        """Save a resumable run: weights, optimizer, replay buffer, RNG states and stats.
+
+        While training, the save is handed to the training thread and
+        happens at the next episode boundary so the state is consistent.
+        """
+        if not self.agent:
+            raise ValueError("No agent to save")
+        if os.path.basename(name) != name or not name:
+            raise ValueError(f"Invalid run name: {name}")
+
+        if self.is_training and self.training_thread and self.training_thread.is_alive():
+            request = {"name": name, "done": threading.Event()}
+            with self.stats_lock:
+                self._save_requests.append(request)
+            if not request["done"].wait(timeout):
+                raise TimeoutError("Training did not reach an episode boundary in time")
+            if "error" in request:
+                raise request["error"]
+            return request["result"]
+        return self._save_run(name)
+
+    def _process_save_requests(self):
+        with self.stats_lock:
+            requests, self._save_requests = self._save_requests, []
+        for request in requests:
+            try:
+                request["result"] = self._save_run(request["name"])
+            except Exception as e:
+                request["error"] = e
+            request["done"].set()
+
+    def _save_run(self, name: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        directory = os.path.join(self.runs_dir, name)
+        with self.stats_lock:
+            stats = dict(self.training_stats)
+            metrics = self.metrics.state_dict()
+
+        def write(temp_dir: str):
+            checkpoint = self.agent.checkpoint_state()
+            checkpoint["rng_state"] = capture_rng_state(self.agent, self.env)
+            torch.save(checkpoint, os.path.join(temp_dir, AGENT_FILE))
+            replay = self.agent.memory.save(os.path.join(temp_dir, REPLAY_DIR))
+            with open(os.path.join(temp_dir, RUN_FILE), "w") as f:
+                json.dump({
+                    "name": name,
+                    "saved": time.time(),
+                    "episode": stats["episode"],
+                    "config": self.config,
+                    "training_stats": stats,
+                    "metrics": metrics,
+                    "replay": replay
+                }, f)
+
+        os.makedirs(self.runs_dir, exist_ok=True)
+        with tracer.span("save_run", "save", name=name):
+            write_run_dir(directory, write)
+        return {
+            "name": name,
+            "path": directory,
+            "episode": stats["episode"],
+            "replay_size": len(self.agent.memory),
+            "seconds": time.perf_counter() - start
+        }
+
+    def resume_run(self, name: str) -> Dict[str, Any]:
+        """Restore a run saved by save_run; the next start_training continues from it.
+
+        The replay arrays are memory-mapped copy-on-write rather than read,
+        so resuming does not scale with the buffer size.
+        """
+        if self.is_training:
+            raise ValueError("Training in progress")
+        directory = os.path.join(self.runs_dir, os.path.basename(name))
+        if not os.path.exists(os.path.join(directory, RUN_FILE)):
+            raise FileNotFoundError(f"Run not found: {name}")
+
+        start = time.perf_counter()
+        info = read_run_info(directory)
+        self.initialize_agent(info["config"])
+        checkpoint = torch.load(os.path.join(directory, AGENT_FILE), map_location="cpu",
+                                weights_only=True)
+        self.agent.load_checkpoint(checkpoint)
+        self.agent.memory.load(os.path.join(directory, REPLAY_DIR), info["replay"])
+        restore_rng_state(checkpoint["rng_state"], self.agent, self.env)
+
+        with self.stats_lock:
+            self.training_stats = {key: value for key, value in info["training_stats"].items()
+                                   if key not in SERIES_FIELDS}
+            self.metrics = MetricsStore(SERIES_FIELDS)
+            if "metrics" in info:
+                self.metrics.load_state_dict(info["metrics"])
+            else:
+                # Runs saved before the metrics store kept the full lists
+                for key in SERIES_FIELDS:
+                    for episode, value in enumerate(info["training_stats"].get(key, []), 1):
+                        self.metrics.append(key, episode, value)
+            # Skip a sequence number so connected clients resync to the restored stats
+            self.stats_seq += 1
+            self._sent_points = {field: len(self.metrics[field]) for field in SERIES_FIELDS}
+        self._resume_episode = info["episode"]
+        self.notify_callbacks()
+
+        return {
+            "name": name,
+            "episode": info["episode"],
+            "replay_size": len(self.agent.memory),
+            "config": info["config"],
+            "seconds": time.perf_counter() - start
+        }
 
-            # Update target network every 100 episodes
-            if episode % 100 == 0:
-                self.agent.update_target_network()
+    def _checkpoint_written(self, filepath: str, info: Dict[str, Any]):
+        if self.model_registry is not None:
+            self.model_registry.register(filepath, episode=info["episode"], config=self.config)
 
-            # Update statistics
+    def _checkpoint_removed(self, filepath: str):
+        if self.model_registry is not None:
+            self.model_registry.remove(os.path.basename(filepath))
+        if self.policy_cache is not None:
+            self.policy_cache.invalidate(filepath)
+
+    def _record_episode(self, episode: int, total_reward: float, steps: int, loss: Optional[float]):
+        """Update statistics with a finished episode and notify callbacks"""
+        _EPISODES.inc()
+        with self.stats_lock:
             self.training_stats["episode"] = episode + 1
             self.training_stats["current_reward"] = total_reward
+            self.training_stats["total_steps"] += steps
             self.training_stats["epsilon"] = self.agent.epsilon
-            self.training_stats["episode_rewards"].append(total_reward)
+            self.metrics.append("episode_rewards", episode + 1, total_reward)
+
+            # Learner throughput over wall-clock training time
+            elapsed = time.perf_counter() - self._train_start if self._train_start else 0
+            self.training_stats["grad_steps"] = self.agent.grad_steps
+            if elapsed > 0:
+                self.training_stats["grad_steps_per_sec"] = self.agent.grad_steps / elapsed
+                self.training_stats["samples_per_sec"] = self.agent.samples_trained / elapsed
 
             if loss is not None:
                 self.training_stats["loss"] = loss
-                self.training_stats["losses"].append(loss)
+                self.metrics.append("losses", episode + 1, loss)
 
             # Calculate average reward over last 100 episodes
-            recent_rewards = self.training_stats["episode_rewards"][-100:]
-            self.training_stats["average_reward"] = np.mean(recent_rewards)
+            recent_rewards = self.metrics["episode_rewards"].tail(100)
+            self.training_stats["average_reward"] = float(np.mean(recent_rewards))
 
-            # Notify callbacks
-            self.notify_callbacks()
+        if self.history_writer:
+            self.history_writer.append(episode + 1, {
+                "episode_rewards": total_reward, "losses": loss, "epsilon": self.agent.epsilon
+            })
 
-            # Small delay to prevent overwhelming the system
-            time.sleep(0.01)
+        # Notify callbacks
+        self.notify_callbacks()
 
     def get_training_status(self) -> Dict[str, Any]:
         """Get current training status"""
-        return {
+        snapshot = self.get_stats_snapshot()
+        status = {
             "is_training": self.is_training,
-            "stats": self.training_stats.copy()
+            "error": self.training_error,
+            "seq": snapshot["seq"],
+            "stats": snapshot["stats"]
         }
+        if self.agent:
+            status["replay_memory"] = {
+                "size": len(self.agent.memory),
+                "capacity": self.agent.memory.capacity,
+                "bytes": self.agent.memory.nbytes,
+                "bytes_per_transition": self.agent.memory.bytes_per_transition,
+                "compact": isinstance(self.agent.memory, CompactReplayBuffer)
+            }
+            status["learner"] = {
+                "update_mode": self.update_mode,
+                "updates_per_episode": self.updates_per_episode,
+                "updates_per_step": self.updates_per_step,
+                "num_minibatches": self.num_minibatches,
+                "learning_starts": self.learning_starts,
+                "grad_steps": self.agent.grad_steps,
+                "samples": self.agent.samples_trained,
+                "learn_seconds": self._learn_seconds,
+                # Rates while the learner is running, excluding env stepping
+                "busy_grad_steps_per_sec": (self.agent.grad_steps / self._learn_seconds
+                                            if self._learn_seconds else 0.0),
+                "busy_samples_per_sec": (self.agent.samples_trained / self._learn_seconds
+                                         if self._learn_seconds else 0.0)
+            }
+        if self.actor_pool is not None:
+            status["actors"] = self.actor_pool.get_stats()
+        if self.checkpoint_writer is not None:
+            status["checkpoints"] = self.checkpoint_writer.get_stats()
+        return status
 
     def test_agent(self, render_video: bool = False) -> Dict[str, Any]:
-        """Test the trained agent"""
+        """Test the trained agent, streaming rendered frames to a video encoder"""
         if not self.agent:
             return {"error": "No trained agent available"}
 
         total_rewards = []
-        frames = []
-
-        for _ in range(5):  # Test 5 episodes
-            state, _ = self.env.reset()
-            total_reward = 0
-            episode_frames = []
-
-            while True:
-                if render_video:
-                    frame = self.env.render()
-                    episode_frames.append(frame)
-
-                action = self.agent.act(state)
-                state, reward, terminated, truncated, _ = self.env.step(action)
-                total_reward += reward
-
-                if terminated or truncated:
-                    break
-
-            total_rewards.append(total_reward)
-            if render_video and episode_frames:
-                frames.extend(episode_frames)
-
-        return {
-            "average_reward": np.mean(total_rewards),
+        encoder = None
+        filename = None
+        if render_video:
+            filename = f"test_{int(time.time() * 1000)}.mp4"
+            encoder = VideoEncoder(f"static/videos/{filename}")
+
+        try:
+            for _ in range(5):  # Test 5 episodes
+                state, _ = self.env.reset()
+                total_reward = 0
+
+                while True:
+                    if encoder:
+                        encoder.write(self.env.render())
+
+                    action = self.agent.act(state)
+                    state, reward, terminated, truncated, _ = self.env.step(action)
+                    total_reward += reward
+
+                    if terminated or truncated:
+                        break
+
+                total_rewards.append(total_reward)
+        except Exception:
+            if encoder:
+                encoder.abort()
+            raise
+
+        result = {
+            "average_reward": float(np.mean(total_rewards)),
             "rewards": total_rewards,
-            "frames": frames if render_video else None
+            "video_url": None
         }
+        if encoder:
+            encoder.close()
+            result["video_url"] = f"/api/videos/{filename}"
+            result["frames"] = encoder.frames_written
+        return result
+
+    def evaluate_agent(self, n_episodes: int = 100, num_envs: int = 8,
+                       vector_mode: str = "sync", seed: Optional[int] = None) -> Dict[str, Any]:
+        """Greedy evaluation of a frozen copy of the policy on separate environments"""
+        if not self.agent:
+            return {"error": "No trained agent available"}
+
+        return evaluate_policy(
+            self.agent.q_network, n_episodes=n_episodes, num_envs=num_envs,
+            vector_mode=vector_mode, seed=seed, backend=self.agent.inference_backend
+        )
 
     def save_model(self, name: str) -> str:
         """Save the trained model"""
         if not self.agent:
             raise ValueError("No agent to save")
 
-        filepath = f"models/saved/{name}.pth"
-        self.agent.save_model(filepath)
+        filepath = os.path.join(self.models_dir, f"{name}.pth")
+        with tracer.span("save_model", "save", name=name):
+            self.agent.save_model(filepath)
         return filepath
 
     def load_model(self, filepath: str):
@@ -181,4 +821,7 @@ class TrainingManager:
         if not self.agent:
             raise ValueError("Agent not initialized")
 
-        self.agent.load_model(filepath)
+        if self.policy_cache is not None:
+            self.agent.load_checkpoint(self.policy_cache.get_checkpoint(filepath))
+        else:
+            self.agent.load_model(filepath)
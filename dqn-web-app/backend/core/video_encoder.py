@@ -0,0 +1,87 @@
+
+import os
+import queue
+import threading
+import cv2
+
+class VideoEncoder:
+    """Encodes RGB frames to a video file on a background thread.
+
+    ``write`` hands each frame to the encoder thread through a small bounded
+    queue, so at most ``max_pending`` frames are held in memory regardless of
+    episode length (the producer waits if the encoder falls behind). Frames
+    are written to a temporary file that ``close`` renames into place, so a
+    partially encoded video never appears under the final name.
+    """
+
+    def __init__(self, filepath: str, fps: int = 30, fourcc: str = "mp4v", max_pending: int = 32):
+        self.filepath = filepath
+        root, ext = os.path.splitext(filepath)
+        # Keep the extension last: OpenCV picks the container from it
+        self.temp_path = f"{root}.part{ext}"
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.frames_written = 0
+        self.error = None
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, frame):
+        """Queue one RGB frame for encoding"""
+        if self.error is not None:
+            raise RuntimeError(f"Video encoding failed: {self.error}")
+        self._queue.put(frame)
+
+    def close(self) -> str:
+        """Flush remaining frames, finalize the file and return its path"""
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None or self.frames_written == 0:
+            self._remove_temp()
+            raise RuntimeError(f"Video encoding failed: {self.error or 'no frames written'}")
+
+        os.replace(self.temp_path, self.filepath)
+        return self.filepath
+
+    def abort(self):
+        """Stop encoding and discard the partial file"""
+        self._queue.put(None)
+        self._thread.join()
+        self._remove_temp()
+
+    def _remove_temp(self):
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def _run(self):
+        writer = None
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    return
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.temp_path, self.fourcc, self.fps, (width, height))
+                # Convert RGB to BGR for OpenCV
+                writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+                self.frames_written += 1
+        except Exception as e:
+            self.error = e
+            # Keep draining so a producer blocked on put() is released
+            while self._queue.get() is not None:
+                pass
+        finally:
+            if writer is not None:
+                writer.release()
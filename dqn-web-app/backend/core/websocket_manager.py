@@ -1,42 +1,224 @@
 
 import asyncio
 import json
-from typing import Set, Dict, Any
+import time
+from collections import deque
+from typing import Set, Dict, Any, Optional, Callable
 from fastapi import WebSocket
+from .instrumentation import instrumentation
+from .tracing import tracer
+
+_SEND_SECONDS = instrumentation.histogram("websocket_send_seconds", "Time to send one WebSocket message")
+_DROPPED = instrumentation.counter("websocket_dropped_total", "Messages dropped from full client queues")
+_EVICTED = instrumentation.counter("websocket_evicted_total", "Clients evicted for falling behind")
+
+class ClientConnection:
+    """Outbound side of one WebSocket: a bounded send queue drained by its own writer task.
+
+    Broadcasting only enqueues, so a slow client never delays the others.
+    When the queue is full the oldest droppable message is discarded; delta
+    clients detect the gap and resync. A client whose oldest pending message
+    is older than ``max_lag`` seconds, or whose send takes longer than
+    ``send_timeout``, is considered stuck and evicted via ``on_stuck``.
+    """
+
+    def __init__(self, websocket: WebSocket, channel: Optional[str], on_stuck: Callable,
+                 max_queue: int = 64, send_timeout: float = 5.0, max_lag: float = 10.0):
+        self.websocket = websocket
+        self.channel = channel
+        self.on_stuck = on_stuck
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.max_lag = max_lag
+
+        # Entries are (enqueue time, text, droppable)
+        self.queue = deque()
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.last_send_latency = 0.0
+        self.closed = False
+        self.task = asyncio.get_running_loop().create_task(self._writer())
+
+    @property
+    def lag(self) -> float:
+        """Seconds the oldest unsent message has been waiting"""
+        return time.monotonic() - self.queue[0][0] if self.queue else 0.0
+
+    def enqueue(self, text: str, droppable: bool = True):
+        if self.closed:
+            return
+        if self.lag > self.max_lag:
+            self.on_stuck(self)
+            return
+
+        if len(self.queue) >= self.max_queue:
+            for i, entry in enumerate(self.queue):
+                if entry[2]:
+                    del self.queue[i]
+                    break
+            else:
+                self.queue.popleft()
+            self.dropped += 1
+            _DROPPED.inc()
+
+        self.queue.append((time.monotonic(), text, droppable))
+        self.ready.set()
+
+    async def _writer(self):
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.queue:
+                    _, text, _ = self.queue.popleft()
+                    start = time.perf_counter()
+                    await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+                    end = time.perf_counter()
+                    self.last_send_latency = end - start
+                    _SEND_SECONDS.observe(self.last_send_latency)
+                    if tracer.enabled:
+                        # Writers of different clients overlap on the loop thread
+                        tracer.complete_async("send", "broadcast", start, end, id(self),
+                                              {"bytes": len(text)})
+                    self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out: the client is gone or stuck
+            self.on_stuck(self)
+
+    def stop(self):
+        """Stop the writer and discard pending messages"""
+        self.closed = True
+        self.queue.clear()
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+
+    def close(self):
+        """Stop the writer and close the socket without waiting on it"""
+        if self.closed:
+            return
+        self.stop()
+        asyncio.get_running_loop().create_task(self._close_socket())
+
+    async def _close_socket(self):
+        try:
+            await asyncio.wait_for(self.websocket.close(), self.send_timeout)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "queue_depth": len(self.queue),
+            "lag": self.lag,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "last_send_latency": self.last_send_latency
+        }
 
 class WebSocketManager:
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+    def __init__(self, max_queue: int = 64, send_timeout: float = 5.0, max_lag: float = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.max_lag = max_lag
+        # Per-session channels; the default channel is None
+        self.channels: Dict[Optional[str], Dict[WebSocket, ClientConnection]] = {}
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.evicted = 0
+
+    @property
+    def active_connections(self) -> Set[WebSocket]:
+        return set(self.channels.get(None, {}))
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, channel: Optional[str] = None):
         await websocket.accept()
-        self.active_connections.add(websocket)
+        client = ClientConnection(
+            websocket, channel, self._evict, max_queue=self.max_queue,
+            send_timeout=self.send_timeout, max_lag=self.max_lag
+        )
+        self.channels.setdefault(channel, {})[websocket] = client
+        self.clients[websocket] = client
+
+    def _remove(self, websocket: WebSocket) -> Optional[ClientConnection]:
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            connections = self.channels.get(client.channel, {})
+            connections.pop(websocket, None)
+            if not connections:
+                self.channels.pop(client.channel, None)
+        return client
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.discard(websocket)
+    def disconnect(self, websocket: WebSocket, channel: Optional[str] = None):
+        client = self._remove(websocket)
+        if client is not None:
+            client.stop()
+
+    def _evict(self, client: ClientConnection):
+        """Disconnect a client that fell too far behind or failed to send"""
+        if self._remove(client.websocket) is client:
+            self.evicted += 1
+            _EVICTED.inc()
+        client.close()
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        try:
-            await websocket.send_text(message)
-        except:
-            self.disconnect(websocket)
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.enqueue(message, droppable=False)
 
-    async def broadcast(self, message: Dict[str, Any]):
-        if not self.active_connections:
+    async def broadcast(self, message: Dict[str, Any], channel: Optional[str] = None):
+        connections = self.channels.get(channel)
+        if not connections:
             return
 
-        message_text = json.dumps(message)
-        disconnected = set()
+        with tracer.span("broadcast", "broadcast", type=message.get("type"), clients=len(connections)):
+            message_text = json.dumps(message)
+            for client in list(connections.values()):
+                client.enqueue(message_text)
+
+    def register_metrics(self, registry):
+        """Expose connection count, queue depth and lag as gauges of registry"""
+        def clients():
+            return list(self.clients.values())
+
+        registry.gauge("websocket_connections", "Open WebSocket connections",
+                       lambda: len(self.clients))
+        registry.gauge("websocket_queue_depth", "Messages queued for sending, all clients",
+                       lambda: sum(len(c.queue) for c in clients()))
+        registry.gauge("websocket_max_queue_depth", "Longest client send queue",
+                       lambda: max((len(c.queue) for c in clients()), default=0))
+        registry.gauge("websocket_max_lag_seconds", "Age of the oldest unsent message",
+                       lambda: max((c.lag for c in clients()), default=0.0))
 
-        for connection in self.active_connections.copy():
-            try:
-                await connection.send_text(message_text)
-            except:
-                disconnected.add(connection)
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-client queue depth, lag and drop counters"""
+        clients = [client.get_stats() for client in self.clients.values()]
+        return {
+            "connections": len(clients),
+            "evicted": self.evicted,
+            "max_lag": max((c["lag"] for c in clients), default=0.0),
+            "total_queued": sum(c["queue_depth"] for c in clients),
+            "total_dropped": sum(c["dropped"] for c in clients),
+            "clients": clients
+        }
 
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection)
+    async def send_snapshot(self, websocket: WebSocket, snapshot: Dict[str, Any]):
+        """Send a full stats snapshot to one client so it can resync its delta stream"""
+        await self.send_personal_message(json.dumps({
+            "type": "training_snapshot",
+            "data": snapshot
+        }), websocket)
+
+    async def handle_client_message(self, websocket: WebSocket, text: str,
+                                    get_snapshot: Callable[[], Dict[str, Any]]):
+        """Answer client requests; currently only {"type": "resync"}"""
+        try:
+            request = json.loads(text)
+        except ValueError:
+            return
+        if isinstance(request, dict) and request.get("type") == "resync":
+            await self.send_snapshot(websocket, get_snapshot())
 
     async def broadcast_training_update(self, stats: Dict[str, Any]):
         await self.broadcast({
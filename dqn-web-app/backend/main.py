@@ -2,7 +2,7 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 import uvicorn
 import asyncio
 from typing import Dict, Any, Optional
@@ -10,8 +10,18 @@ import os
 import json
 from datetime import datetime
 
-from core.training_manager import TrainingManager
+from config import Config
+from core.training_manager import TrainingManager, merge_stats_deltas
+from core.event_bridge import EventBridge
+from core.session_scheduler import SessionScheduler
+from core.sweep import SweepRunner
+from core.model_registry import ModelRegistry
+from core.run_history import RunHistory
+from core.policy_cache import PolicyCache
+from core.inference_server import MicroBatcher
 from core.websocket_manager import websocket_manager
+from core.instrumentation import instrumentation
+from core.tracing import tracer
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -32,13 +42,71 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Loaded checkpoints and inference policies, reused across model loads
+policy_cache = PolicyCache(max_bytes=Config.POLICY_CACHE_MB * 1024 * 1024)
+
+# Micro-batched inference over saved models for /api/predict and /ws/predict
+inference_batcher = MicroBatcher(
+    policy_cache,
+    models_dir=Config.MODELS_DIR,
+    max_batch_size=Config.PREDICT_MAX_BATCH,
+    max_wait=Config.PREDICT_MAX_WAIT_MS / 1000
+)
+
+# Index of saved models with their training metadata
+model_registry = ModelRegistry(Config.MODELS_DIR, Config.MODEL_INDEX_PATH)
+
+# On-disk reward/loss/epsilon history of past training runs
+run_history = RunHistory(Config.HISTORY_DIR, flush_interval=Config.HISTORY_FLUSH_SECONDS)
+
 # Global training manager
-training_manager = TrainingManager()
+training_manager = TrainingManager(policy_cache=policy_cache, model_registry=model_registry,
+                                   run_history=run_history)
+
+async def deliver_event(channel: Optional[str], message: Dict[str, Any]):
+    await websocket_manager.broadcast(message, channel=channel)
+
+# Bridge from training/worker threads to the event loop, coalescing
+# training updates to at most one per channel every UPDATE_INTERVAL_MS
+event_bridge = EventBridge(
+    deliver_event,
+    interval=Config.UPDATE_INTERVAL_MS / 1000,
+    maxsize=Config.EVENT_QUEUE_SIZE,
+    mergers={"training_update": merge_stats_deltas}
+)
+
+# Opt-in span timeline, started and exported through /api/trace
+tracer.capacity = Config.TRACE_BUFFER_EVENTS
+
+# Gauges read when /metrics is scraped
+training_manager.register_metrics(instrumentation)
+websocket_manager.register_metrics(instrumentation)
+instrumentation.gauge("event_queue_depth", "Events waiting in the training-to-WebSocket bridge",
+                      lambda: event_bridge.queue.qsize())
+
+# Scheduler for concurrent training sessions in worker processes
+session_scheduler = SessionScheduler(
+    max_concurrent=Config.MAX_CONCURRENT_SESSIONS,
+    models_dir=Config.MODELS_DIR,
+    history_dir=Config.HISTORY_DIR
+)
+
+# Parallel hyperparameter sweeps with a config-hash result cache
+sweep_runner = SweepRunner(
+    max_workers=Config.MAX_SWEEP_WORKERS,
+    cache_path=os.path.join(Config.SWEEPS_DIR, "trials.jsonl")
+)
 
 # Import and include routers after training_manager is defined
-from api.endpoints import training, models
+from api.endpoints import training, models, sessions, sweeps, videos, predict, history, trace
 app.include_router(training.router, prefix="/api", tags=["training"])
 app.include_router(models.router, prefix="/api", tags=["models"])
+app.include_router(sessions.router, prefix="/api", tags=["sessions"])
+app.include_router(sweeps.router, prefix="/api", tags=["sweeps"])
+app.include_router(videos.router, prefix="/api", tags=["videos"])
+app.include_router(predict.router, prefix="/api", tags=["predict"])
+app.include_router(history.router, prefix="/api", tags=["history"])
+app.include_router(trace.router, prefix="/api", tags=["trace"])
 
 @app.get("/")
 async def root():
@@ -53,17 +121,120 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket_manager.connect(websocket)
     try:
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
+            message = await websocket.receive_text()
+            await websocket_manager.handle_client_message(
+                websocket, message, training_manager.get_stats_snapshot
+            )
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket)
 
+@app.websocket("/ws/sessions/{session_id}")
+async def session_websocket_endpoint(websocket: WebSocket, session_id: str):
+    await websocket_manager.connect(websocket, channel=session_id)
+
+    def session_snapshot():
+        session = session_scheduler.get(session_id)
+        return session.snapshot() if session else {"seq": 0, "stats": {}}
+
+    try:
+        while True:
+            message = await websocket.receive_text()
+            await websocket_manager.handle_client_message(websocket, message, session_snapshot)
+    except WebSocketDisconnect:
+        websocket_manager.disconnect(websocket, channel=session_id)
+
+@app.websocket("/ws/sweeps/{sweep_id}")
+async def sweep_websocket_endpoint(websocket: WebSocket, sweep_id: str):
+    await websocket_manager.connect(websocket, channel=sweep_id)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        websocket_manager.disconnect(websocket, channel=sweep_id)
+
+@app.websocket("/ws/predict")
+async def predict_websocket_endpoint(websocket: WebSocket):
+    """Pipelined predictions: each {"id", "model", "states"} message gets a reply with the same id"""
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    pending = set()
+
+    async def answer(request: Dict[str, Any]):
+        reply = {"id": None}
+        try:
+            reply["id"] = request.get("id")
+            q_values, actions = await inference_batcher.predict(request["model"], request["states"])
+            reply.update(q_values=q_values.tolist(), actions=actions.tolist())
+        except Exception as e:
+            reply["error"] = str(e)
+        async with send_lock:
+            await websocket.send_text(json.dumps(reply))
+
+    try:
+        while True:
+            try:
+                request = json.loads(await websocket.receive_text())
+            except ValueError:
+                async with send_lock:
+                    await websocket.send_text(json.dumps({"id": None, "error": "Invalid JSON"}))
+                continue
+            # Answer concurrently so pipelined requests share micro-batches
+            task = asyncio.create_task(answer(request))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    except WebSocketDisconnect:
+        for task in pending:
+            task.cancel()
+
+@app.get("/api/events/stats")
+async def get_event_stats():
+    """Counters of the training-thread to WebSocket event bridge"""
+    return event_bridge.get_stats()
+
+@app.get("/api/websocket/stats")
+async def get_websocket_stats():
+    """Per-client WebSocket send queue depth, lag and drop counters"""
+    return websocket_manager.get_stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Phase latency histograms, throughput, replay and WebSocket gauges in Prometheus text format"""
+    return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("startup")
+async def start_background_services():
+    event_bridge.start()
+    session_scheduler.start()
+    inference_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    session_scheduler.shutdown()
+    sweep_runner.shutdown()
+    await event_bridge.stop()
+    await inference_batcher.stop()
+    model_registry.close()
+    run_history.close()
+
 # Set up training callbacks
 def training_callback(stats: Dict[str, Any]):
-    """Callback function for training updates"""
-    asyncio.create_task(websocket_manager.broadcast_training_update(stats))
+    """Callback function for training updates (sequence-numbered stats deltas)"""
+    event_bridge.publish(None, {"type": "training_update", "data": stats})
 
 training_manager.add_callback(training_callback)
 
+def register_session_model(session_id: str, message: Dict[str, Any]):
+    """Index the model a finished session saved"""
+    session = session_scheduler.get(session_id)
+    if (message["type"] == "session_status" and session and session.model_path
+            and session.status in ("completed", "stopped")):
+        model_registry.register(session.model_path, episode=session.stats.get("episode"),
+                                config=session.config)
+
+# Session and sweep events arrive on scheduler threads as (channel, message)
+session_scheduler.add_listener(event_bridge.publish)
+session_scheduler.add_listener(register_session_model)
+sweep_runner.add_listener(event_bridge.publish)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,41 @@
+
+import os
+
+import pytest
+
+from core.training_manager import TrainingManager
+from core.tracing import tracer
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = TrainingManager()
+    manager.models_dir = str(tmp_path / "saved")
+    manager.runs_dir = str(tmp_path / "runs")
+    os.makedirs(manager.models_dir)
+    manager.initialize_agent({"episodes": 1, "memory_size": 100})
+    yield manager
+    manager.env.close()
+
+@pytest.mark.parametrize("tracing", [False, True])
+def test_save_model(manager, tracing):
+    if tracing:
+        tracer.start()
+    try:
+        filepath = manager.save_model("smoke")
+    finally:
+        tracer.stop()
+    assert os.path.exists(filepath)
+    manager.load_model(filepath)
+
+@pytest.mark.parametrize("tracing", [False, True])
+def test_save_run(manager, tracing):
+    if tracing:
+        tracer.start()
+    try:
+        result = manager.save_run("smoke")
+    finally:
+        tracer.stop()
+    assert os.path.isdir(result["path"])
+    if tracing:
+        spans = [event for event in tracer.export()["traceEvents"] if event["name"] == "save_run"]
+        assert spans and spans[0]["args"] == {"name": "smoke"}
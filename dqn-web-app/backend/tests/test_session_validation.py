@@ -0,0 +1,17 @@
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app, session_scheduler
+
+client = TestClient(app)
+
+@pytest.mark.parametrize("config", [
+    {"num_envs": 4, "vector_mode": "async"},
+    {"distributed": True},
+])
+def test_session_rejects_child_processes(config):
+    before = set(session_scheduler.sessions)
+    response = client.post("/api/sessions", json={"episodes": 1, **config})
+    assert response.status_code == 400
+    assert set(session_scheduler.sessions) == before
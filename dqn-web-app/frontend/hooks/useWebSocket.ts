@@ -1,6 +1,11 @@
 
 import { useEffect, useRef, useState } from 'react';
-import { WebSocketMessage } from '@/types';
+import {
+  TrainingStats,
+  TrainingStatsDelta,
+  TrainingStatsSnapshot,
+  WebSocketMessage,
+} from '@/types';
 
 interface UseWebSocketOptions {
   url: string;
@@ -10,26 +15,128 @@ interface UseWebSocketOptions {
   onDisconnect?: () => void;
 }
 
+// Recent points kept per series, matching the server's snapshot window
+const SERIES_WINDOW = 1000;
+
+// Append the points of a delta series that are not already in `series`,
+// which starts at index `start`, keeping the last SERIES_WINDOW points.
+// Returns null when the delta starts past the end (points were missed).
+const mergeSeries = (
+  series: number[],
+  start: number,
+  values: number[],
+  offset: number
+): { series: number[]; start: number } | null => {
+  const end = start + series.length;
+  if (offset > end) {
+    return null;
+  }
+  const merged = series.concat(values.slice(end - offset));
+  const excess = Math.max(0, merged.length - SERIES_WINDOW);
+  return { series: merged.slice(excess), start: start + excess };
+};
+
+const applyDelta = (stats: TrainingStats, delta: TrainingStatsDelta): TrainingStats | null => {
+  const {
+    seq,
+    base_seq,
+    episode_rewards,
+    episode_rewards_offset,
+    losses,
+    losses_offset,
+    ...scalars
+  } = delta;
+  const rewards = mergeSeries(
+    stats.episode_rewards, stats.episode_rewards_offset ?? 0, episode_rewards, episode_rewards_offset
+  );
+  const lossSeries = mergeSeries(stats.losses, stats.losses_offset ?? 0, losses, losses_offset);
+  if (!rewards || !lossSeries) {
+    return null;
+  }
+  return {
+    ...stats,
+    ...scalars,
+    episode_rewards: rewards.series,
+    episode_rewards_offset: rewards.start,
+    losses: lossSeries.series,
+    losses_offset: lossSeries.start,
+  };
+};
+
 export const useWebSocket = (options: UseWebSocketOptions) => {
   const ws = useRef<WebSocket | null>(null);
   const [isConnected, setIsConnected] = useState(false);
   const [lastMessage, setLastMessage] = useState<WebSocketMessage | null>(null);
 
+  // Stats accumulated from the delta stream and the last applied sequence number
+  const stats = useRef<TrainingStats | null>(null);
+  const lastSeq = useRef(0);
+  const resyncPending = useRef(false);
+
   useEffect(() => {
+    const requestResync = () => {
+      if (!resyncPending.current && ws.current?.readyState === WebSocket.OPEN) {
+        resyncPending.current = true;
+        ws.current.send(JSON.stringify({ type: 'resync' }));
+      }
+    };
+
+    const deliver = (message: WebSocketMessage) => {
+      setLastMessage(message);
+      options.onMessage?.(message);
+    };
+
+    const deliverStats = () => {
+      deliver({ type: 'training_update', data: stats.current });
+    };
+
+    const handleSnapshot = (snapshot: TrainingStatsSnapshot) => {
+      resyncPending.current = false;
+      stats.current = snapshot.stats;
+      lastSeq.current = snapshot.seq;
+      deliverStats();
+    };
+
+    const handleDelta = (delta: TrainingStatsDelta) => {
+      if (delta.seq <= lastSeq.current) {
+        return; // Already included in the current snapshot
+      }
+      if (!stats.current || delta.base_seq > lastSeq.current) {
+        requestResync();
+        return;
+      }
+      const next = applyDelta(stats.current, delta);
+      if (!next) {
+        requestResync();
+        return;
+      }
+      stats.current = next;
+      lastSeq.current = delta.seq;
+      deliverStats();
+    };
+
     const connect = () => {
       ws.current = new WebSocket(options.url);
 
       ws.current.onopen = () => {
         setIsConnected(true);
         console.log('WebSocket connected');
+        // Start from a full snapshot, then follow the delta stream
+        resyncPending.current = false;
+        requestResync();
         options.onConnect?.();
       };
 
       ws.current.onmessage = (event) => {
         try {
           const message: WebSocketMessage = JSON.parse(event.data);
-          setLastMessage(message);
-          options.onMessage?.(message);
+          if (message.type === 'training_snapshot') {
+            handleSnapshot(message.data);
+          } else if (message.type === 'training_update' && message.data?.seq !== undefined) {
+            handleDelta(message.data);
+          } else {
+            deliver(message);
+          }
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
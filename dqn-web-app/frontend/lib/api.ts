@@ -1,6 +1,14 @@
 
 import axios from 'axios';
-import { TrainingConfig, TrainingStatus, Model, TestResults } from '@/types';
+import {
+  TrainingConfig,
+  TrainingStatus,
+  TrainingStatsHistory,
+  Model,
+  TestResults,
+  HistoryRun,
+  MetricSeries,
+} from '@/types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -28,8 +36,10 @@ export const trainingApi = {
     return response.data;
   },
 
-  getStats: async () => {
-    const response = await api.get('/api/training/stats');
+  getStats: async (
+    params: { start?: number; end?: number; points?: number } = {}
+  ): Promise<TrainingStatsHistory> => {
+    const response = await api.get('/api/training/stats', { params });
     return response.data;
   },
 
@@ -41,7 +51,7 @@ export const trainingApi = {
 
 // Models API
 export const modelsApi = {
-  list: async (): Promise<{ models: Model[] }> => {
+  list: async (): Promise<{ models: Model[]; total: number }> => {
     const response = await api.get('/api/models');
     return response.data;
   },
@@ -65,3 +75,37 @@ export const modelsApi = {
     return `${API_BASE_URL}/api/models/download/${filename}`;
   },
 };
+
+// Run history API: past training runs and slices of their curves
+export const historyApi = {
+  list: async (limit?: number, offset: number = 0): Promise<{ runs: HistoryRun[]; total: number }> => {
+    const response = await api.get('/api/history/runs', { params: { limit, offset } });
+    return response.data;
+  },
+
+  series: async (
+    runId: string,
+    name: 'episode_rewards' | 'losses' | 'epsilon',
+    params: { start?: number; end?: number; points?: number } = {}
+  ): Promise<MetricSeries> => {
+    const response = await api.get(`/api/history/runs/${runId}/series/${name}`, { params });
+    return response.data;
+  },
+
+  compare: async (
+    runIds: string[],
+    series: string = 'episode_rewards',
+    points: number = 200
+  ): Promise<{ series: string; runs: Record<string, MetricSeries | null> }> => {
+    const response = await api.get('/api/history/compare', {
+      params: { run_ids: runIds, series, points },
+      paramsSerializer: { indexes: null },
+    });
+    return response.data;
+  },
+
+  delete: async (runId: string) => {
+    const response = await api.delete(`/api/history/runs/${runId}`);
+    return response.data;
+  },
+};
@@ -17,12 +17,37 @@ export interface TrainingStats {
   average_reward: number;
   epsilon: number;
   loss: number;
+  total_steps: number;
+  grad_steps: number;
+  grad_steps_per_sec: number;
+  samples_per_sec: number;
+  // Most recent points of each series; *_offset is the index of the first one
   episode_rewards: number[];
+  episode_rewards_offset?: number;
   losses: number[];
+  losses_offset?: number;
+}
+
+// Stats update: scalar stats plus only the series points added after
+// base_seq, starting at the given offsets. The server may coalesce several
+// updates into one, so seq can be more than base_seq + 1.
+export interface TrainingStatsDelta extends Omit<TrainingStats, 'episode_rewards' | 'losses'> {
+  seq: number;
+  base_seq: number;
+  episode_rewards: number[];
+  episode_rewards_offset: number;
+  losses: number[];
+  losses_offset: number;
+}
+
+export interface TrainingStatsSnapshot {
+  seq: number;
+  stats: TrainingStats;
 }
 
 export interface TrainingStatus {
   is_training: boolean;
+  seq: number;
   stats: TrainingStats;
 }
 
@@ -32,16 +57,55 @@ export interface Model {
   size: number;
   created: string;
   modified: string;
+  hash: string | null;
+  episode: number | null;
+  config: Partial<TrainingConfig> | null;
+  eval_score: number | null;
 }
 
 export interface WebSocketMessage {
-  type: 'training_update' | 'training_complete' | 'error';
+  type: 'training_update' | 'training_snapshot' | 'training_complete' | 'error';
   data?: any;
   message?: string;
 }
 
+// One series from /api/training/stats: raw points, or rollup/LTTB points
+// each standing for `resolution` or more episodes with their min/max envelope
+export interface MetricSeries {
+  episodes: number[];
+  values: number[];
+  min?: number[];
+  max?: number[];
+  resolution: number;
+  method: 'raw' | 'rollup' | 'lttb';
+}
+
+export interface TrainingStatsHistory {
+  episode_rewards: MetricSeries;
+  losses: MetricSeries;
+  current_episode: number;
+  total_episodes: number;
+  average_reward: number;
+  epsilon: number;
+}
+
+export interface HistoryRun {
+  run_id: string;
+  name: string;
+  status: 'running' | 'completed' | 'stopped' | 'failed' | 'interrupted';
+  started: string;
+  updated: string;
+  ended: string | null;
+  episodes: number;
+  last_episode: number | null;
+  average_reward: number | null;
+  best_reward: number | null;
+  config: Partial<TrainingConfig> | null;
+}
+
 export interface TestResults {
   average_reward: number;
   rewards: number[];
-  frames?: any[];
+  video_url: string | null;
+  frames?: number;
 }